@@ -10,14 +10,359 @@ Each tool queries a specific data source and returns structured information.
 
 import pandas as pd
 import numpy as np
-import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+import logging
+import re
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
+import torch
 from datetime import datetime, timedelta
 
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+    HAS_ONNX = True
+except ImportError:
+    HAS_ONNX = False
+
+try:
+    import faiss
+    HAS_FAISS = True
+except ImportError:
+    HAS_FAISS = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    import json
+    HAS_ORJSON = False
+
+logger = logging.getLogger(__name__)
+
+
+# Torch threads used by the embedding model. A handful of intra-op threads
+# gives the best latency for a single query; letting every encode fan out
+# across all cores makes concurrent tool calls fight each other (parallel
+# calls end up slower than serial ones). If encodes are parallelized at the
+# request level, set EMBEDDING_NUM_THREADS to 1 instead.
+EMBEDDING_NUM_THREADS = 4
+EMBEDDING_INTEROP_THREADS = 1
+
+# Hugging Face id of the embedding model used to build the Chroma collections
+EMBEDDING_MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Columns each dataset needs for the tools below. Anything else in the
+# parquet files is skipped at read time (optional columns may be absent).
+TRANSACTION_COLUMNS = [
+    'TransactionID', 'Amount', 'timestamp', 'hour', 'day_of_week', 'is_weekend',
+    'is_night', 'amount_log', 'amount_zscore', 'Class'
+] + [f"V{i}" for i in range(1, 29)]
+
+SIEM_COLUMNS = [
+    'event_id', 'timestamp', 'event_type', 'severity', 'user_id', 'device_id',
+    'ip_address', 'country', 'geo_country', 'details_reason', 'is_high_risk', 'is_suspicious'
+]
+
+KYC_COLUMNS = [
+    'user_id', 'full_name', 'age', 'country', 'employment', 'account_type', 'risk_score',
+    'risk_level', 'avg_monthly_txn', 'device_count', 'account_age_days', 'profile_text'
+]
+
+
+def _read_parquet(path: Path, columns: List[str]) -> pd.DataFrame:
+    """Read only the wanted columns that actually exist in the file."""
+    available = set(pq.read_schema(path).names)
+    return pd.read_parquet(path, columns=[c for c in columns if c in available])
+
+
+# Output fields for row-level tool results: (name, source columns, default, cast).
+# The first source column present in the frame is used.
+SIEM_EVENT_FIELDS = [
+    ("event_id", ("event_id",), 'N/A', None),
+    ("timestamp", ("timestamp",), 'N/A', str),
+    ("event_type", ("event_type",), 'N/A', None),
+    ("severity", ("severity",), 'N/A', None),
+    ("user_id", ("user_id",), 'N/A', None),
+    ("device_id", ("device_id",), 'N/A', None),
+    ("ip_address", ("ip_address",), 'N/A', None),
+    ("country", ("country", "geo_country"), 'N/A', None),
+    ("details", ("details_reason",), 'No details available', None),
+]
+
+TRANSACTION_SAMPLE_FIELDS = [
+    ("transaction_id", ("TransactionID",), 'N/A', None),
+    ("amount", ("Amount",), 0.0, float),
+    ("timestamp", ("timestamp",), 'N/A', str),
+    ("is_fraud", ("Class",), False, bool),
+]
+
+
+def _to_records(df: pd.DataFrame, fields: list) -> List[Dict[str, Any]]:
+    """Format rows as dicts with whole-column operations instead of iterrows()."""
+    columns = {}
+    for name, sources, default, cast in fields:
+        source = next((c for c in sources if c in df.columns), None)
+        if source is None:
+            columns[name] = default
+            continue
+        col = df[source] if cast is None else df[source].astype(cast)
+        columns[name] = col.astype(object).where(col.notna(), default).to_numpy()
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df))).to_dict(orient='records')
+
+
+def _json_default(obj: Any) -> Any:
+    """Stdlib json fallback for the numpy values orjson serializes natively."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+def to_json(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """
+    Serialize a tool result to JSON.
+    
+    orjson handles numpy scalars and arrays natively, so tool results can
+    carry values straight from pandas without per-field float()/int() casts.
+    Anything else it does not know (e.g. Timestamps) is stringified. Without
+    orjson installed, the stdlib json module is used instead.
+    """
+    if not HAS_ORJSON:
+        return json.dumps(obj, default=_json_default, indent=2 if indent else None, sort_keys=sort_keys)
+    option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if indent:
+        option |= orjson.OPT_INDENT_2
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    return orjson.dumps(obj, default=str, option=option).decode()
+
+
+def from_json(text: str) -> Any:
+    """Parse JSON text (with orjson when installed)."""
+    return orjson.loads(text) if HAS_ORJSON else json.loads(text)
+
+
+# Recommendations in priority order (fallback when a brief has no RECOMMENDATION line)
+RECOMMENDATIONS = ("ESCALATE", "VERIFY", "MONITOR", "DISMISS")
+_ACTIONS_PATTERN = "|".join(RECOMMENDATIONS)
+
+
+def brief_regex(score_label: str) -> re.Pattern:
+    """
+    Regex for the RECOMMENDATION line, confidence score and other action mentions.
+    
+    score_label is the pattern for the label the agent's brief template puts
+    before its confidence score. The score must follow that label, so an
+    echoed "Initial Risk Score" is never read as the agent's confidence.
+    Bold markers and colons between label and score are skipped.
+    """
+    return re.compile(
+        r"RECOMMENDATION[^A-Z]*(?P<final>" + _ACTIONS_PATTERN + ")"
+        r"|" + score_label + r"[\s*:]*(?P<score>0\.\d+|1\.0)"
+        r"|(?P<rec>" + _ACTIONS_PATTERN + ")"
+    )
+
+
+def parse_brief(response_text: str, pattern: re.Pattern) -> Tuple[str, float]:
+    """
+    Pull the recommendation and confidence out of a brief in one scan.
+    
+    The stated RECOMMENDATION wins; otherwise the highest-priority action
+    mentioned anywhere (default VERIFY). Confidence defaults to 0.5.
+    """
+    score = None
+    stated = None
+    mentioned = set()
+    for match in pattern.finditer(response_text):
+        if match.group('final'):
+            stated = stated or match.group('final')
+        elif match.group('rec'):
+            mentioned.add(match.group('rec'))
+        elif score is None:
+            score = match.group('score')
+    
+    recommendation = stated or next(
+        (action for action in RECOMMENDATIONS if action in mentioned),
+        "VERIFY"
+    )
+    return recommendation, float(score) if score is not None else 0.5
+
+
+def _to_category(df: pd.DataFrame, columns: List[str]) -> None:
+    """Store low-cardinality string columns as pandas categoricals (in place)."""
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
+
+# Decimals kept when float32 columns are reported in tool results (float32
+# holds ~7 significant digits; more would be widening noise)
+FLOAT32_RESULT_DECIMALS = 6
+
+
+def _downcast(df: pd.DataFrame, float32_columns: List[str], int8_columns: List[str]) -> None:
+    """Shrink numeric columns to float32 / int8 where the values fit (in place)."""
+    for col in float32_columns:
+        if col in df.columns and pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype(np.float32)
+    for col in int8_columns:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            if df[col].between(np.iinfo(np.int8).min, np.iinfo(np.int8).max).all():
+                df[col] = df[col].astype(np.int8)
+
+
+class locked_cached_property(cached_property):
+    """
+    cached_property whose value is built at most once per instance.
+    
+    Since Python 3.12 cached_property has no lock, so tool threads racing
+    on a cold resource would each load the model or dataset. Each
+    property gets its own lock per instance, so unrelated resources can
+    still load in parallel.
+    """
+    _locks_guard = threading.Lock()
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        with self._locks_guard:
+            locks = instance.__dict__.setdefault('_property_locks', {})
+            lock = locks.setdefault(self.attrname, threading.Lock())
+        with lock:
+            # Another thread may have finished loading while we waited
+            if self.attrname in instance.__dict__:
+                return instance.__dict__[self.attrname]
+            return super().__get__(instance, owner)
+
+
+class QuantizedEmbeddingModel:
+    """
+    int8 ONNX Runtime build of all-MiniLM-L6-v2.
+    
+    Drop-in for the SentenceTransformer encode() used by the tools: mean
+    pooling + L2 normalization, same as the sentence-transformers pipeline.
+    The exported and quantized model is cached in `cache_dir`, so only the
+    first start pays for the conversion.
+    """
+    
+    MAX_SEQ_LENGTH = 256
+    
+    # One export at a time, so two tool sets never write the same cache_dir
+    _export_lock = threading.Lock()
+    
+    def __init__(self, cache_dir: Path):
+        with self._export_lock:
+            if not (cache_dir / "model_quantized.onnx").exists():
+                fp32_dir = cache_dir / "fp32"
+                ORTModelForFeatureExtraction.from_pretrained(EMBEDDING_MODEL_ID, export=True).save_pretrained(fp32_dir)
+                AutoTokenizer.from_pretrained(EMBEDDING_MODEL_ID).save_pretrained(cache_dir)
+                quantizer = ORTQuantizer.from_pretrained(fp32_dir)
+                quantizer.quantize(
+                    save_dir=cache_dir,
+                    quantization_config=AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+                )
+        
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = EMBEDDING_NUM_THREADS
+        session_options.inter_op_num_threads = EMBEDDING_INTEROP_THREADS
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            cache_dir,
+            file_name="model_quantized.onnx",
+            session_options=session_options
+        )
+    
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        """Embed one string (1-D result) or a list of strings (2-D result)."""
+        texts = [sentences] if isinstance(sentences, str) else list(sentences)
+        
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(
+                texts[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.MAX_SEQ_LENGTH,
+                return_tensors="np"
+            )
+            token_embeddings = self.model(**inputs).last_hidden_state
+            
+            # Mean pooling over real (non-padding) tokens, then L2 normalize
+            mask = inputs["attention_mask"][..., None].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+            batches.append(pooled / np.linalg.norm(pooled, axis=1, keepdims=True))
+        
+        embeddings = np.vstack(batches).astype(np.float32)
+        return embeddings[0] if isinstance(sentences, str) else embeddings
+
+
+class FlatVectorIndex:
+    """
+    Exact in-memory search over the vectors of a ChromaDB collection.
+    
+    The collections are small (hundreds of vectors), so a FAISS IndexFlatIP
+    scan is both exact and cheaper than Chroma's per-query overhead. Chroma
+    stays the source of truth; this is a read-only copy taken on first use.
+    query() mirrors Collection.query for a single query embedding, including
+    distances in the collection's own metric so similarity scores match.
+    """
+    
+    def __init__(self, collection):
+        data = collection.get(include=['embeddings', 'documents', 'metadatas'])
+        self.documents = data['documents']
+        self.metadatas = data['metadatas']
+        self.space = (collection.metadata or {}).get('hnsw:space', 'l2')
+        
+        vectors = np.asarray(data['embeddings'], dtype=np.float32)
+        self.index = None
+        if len(vectors):
+            faiss.normalize_L2(vectors)
+            self.index = faiss.IndexFlatIP(vectors.shape[1])
+            self.index.add(vectors)
+    
+    def query(self, query_embeddings, n_results: int = 10, where: Optional[Dict[str, Any]] = None) -> Dict[str, list]:
+        """Search one query embedding; `where` supports equality filters on metadata."""
+        hits = []
+        if self.index is not None:
+            query = np.array(query_embeddings, dtype=np.float32).reshape(1, -1)
+            faiss.normalize_L2(query)
+            # With a metadata filter, rank everything and filter afterwards
+            k = self.index.ntotal if where else min(n_results, self.index.ntotal)
+            scores, ids = self.index.search(query, k)
+            for i, score in zip(ids[0], scores[0]):
+                if i == -1:
+                    continue
+                if where and any(self.metadatas[i].get(key) != value for key, value in where.items()):
+                    continue
+                hits.append((i, float(score)))
+                if len(hits) == n_results:
+                    break
+        
+        # Convert cosine similarity back to the collection's distance. Vectors
+        # are unit length, so Chroma's squared L2 distance is 2 - 2 * cos.
+        if self.space == 'l2':
+            distances = [2.0 - 2.0 * score for _, score in hits]
+        else:
+            distances = [1.0 - score for _, score in hits]
+        
+        return {
+            "documents": [[self.documents[i] for i, _ in hits]],
+            "metadatas": [[self.metadatas[i] for i, _ in hits]],
+            "distances": [distances]
+        }
+
 
 class FraudAgentTools:
     """
@@ -31,86 +376,267 @@ class FraudAgentTools:
     - Fraud patterns (known fraud types)
     """
     
-def __init__(self):
-    """
-    Initialize all data sources and connections.
-    """
-    # Get the project root (parent of the agent folder)
-    self.project_root = Path(__file__).parent.parent.resolve()
-    
-    # Define all paths relative to project root
-    self.cleaned_dir = self.project_root / "outputs" / "cleaned"
-    self.cases_dir = self.project_root / "outputs" / "cases"
-    self.kyc_dir = self.project_root / "outputs" / "kyc_profiles"
-    self.patterns_dir = self.project_root / "outputs" / "patterns"
-    self.siem_dir = self.project_root / "outputs" / "siem_logs"
-    self.chroma_dir = self.project_root / "vector_db" / "chroma"
-    
-    # Debug: Print paths
-    print(f"📂 Project root: {self.project_root}")
-    print(f"📂 Cleaned data: {self.cleaned_dir}")
-    print(f"📂 ChromaDB: {self.chroma_dir}")
-    
-    # Verify critical paths exist
-    if not self.cleaned_dir.exists():
-        raise FileNotFoundError(f"Cleaned data directory not found: {self.cleaned_dir}")
-    if not self.chroma_dir.exists():
-        raise FileNotFoundError(f"ChromaDB directory not found: {self.chroma_dir}")
-    
-    # Initialize embedding model
-    print("📥 Loading embedding model...")
-    self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
-    
-    # Initialize ChromaDB
-    print("🔧 Connecting to ChromaDB...")
-    self.chroma_client = chromadb.PersistentClient(
-        path=str(self.chroma_dir),
-        settings=Settings(anonymized_telemetry=False)
-    )
+    def __init__(self):
+        """
+        Set up paths to all data sources.
+        
+        The embedding model, ChromaDB collections and datasets are loaded
+        lazily on first use (see the properties below), so a session that
+        only needs, say, transaction lookups never pays for the rest.
+        Long-lived hosts can call warmup() to load the model and indexes up front.
+        """
+        # Get the project root (parent of the agent folder)
+        self.project_root = Path(__file__).parent.parent.resolve()
+    
+        # Define all paths relative to project root
+        self.cleaned_dir = self.project_root / "outputs" / "cleaned"
+        self.cases_dir = self.project_root / "outputs" / "cases"
+        self.kyc_dir = self.project_root / "outputs" / "kyc_profiles"
+        self.patterns_dir = self.project_root / "outputs" / "patterns"
+        self.siem_dir = self.project_root / "outputs" / "siem_logs"
+        self.chroma_dir = self.project_root / "vector_db" / "chroma"
     
-    # Load collections
-    try:
-        self.cases_collection = self.chroma_client.get_collection("investigation_cases")
-        print("✓ Loaded investigation_cases collection")
-    except ValueError:
-        print("⚠️ Warning: investigation_cases collection not found. Run embedding notebook first.")
-        self.cases_collection = None
-    
-    try:
-        self.patterns_collection = self.chroma_client.get_collection("fraud_patterns")
-        print("✓ Loaded fraud_patterns collection")
-    except ValueError:
-        print("⚠️ Warning: fraud_patterns collection not found. Run embedding notebook first.")
-        self.patterns_collection = None
-    
-    try:
-        self.kyc_collection = self.chroma_client.get_collection("kyc_profiles")
-        print("✓ Loaded kyc_profiles collection")
-    except ValueError:
-        print("⚠️ Warning: kyc_profiles collection not found. Run embedding notebook first.")
-        self.kyc_collection = None
-    
-    # Load static datasets
-    print("📊 Loading datasets...")
-    try:
-        self.df_transactions = pd.read_parquet(self.cleaned_dir / "creditcard_cleaned.parquet")
-        print(f"✓ Loaded {len(self.df_transactions)} transactions")
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Transaction data not found: {self.cleaned_dir / 'creditcard_cleaned.parquet'}")
-    
-    try:
-        self.df_siem = pd.read_parquet(self.cleaned_dir / "siem_logs_cleaned.parquet")
-        print(f"✓ Loaded {len(self.df_siem)} SIEM logs")
-    except FileNotFoundError:
-        raise FileNotFoundError(f"SIEM data not found: {self.cleaned_dir / 'siem_logs_cleaned.parquet'}")
-    
-    try:
-        self.df_kyc = pd.read_parquet(self.cleaned_dir / "kyc_profiles_cleaned.parquet")
-        print(f"✓ Loaded {len(self.df_kyc)} KYC profiles")
-    except FileNotFoundError:
-        raise FileNotFoundError(f"KYC data not found: {self.cleaned_dir / 'kyc_profiles_cleaned.parquet'}")
-    
-    print("✅ All tools initialized successfully\n")
+        logger.debug("📂 Project root: %s", self.project_root)
+        logger.debug("📂 Cleaned data: %s", self.cleaned_dir)
+        logger.debug("📂 ChromaDB: %s", self.chroma_dir)
+    
+        # Verify critical paths exist
+        if not self.cleaned_dir.exists():
+            raise FileNotFoundError(f"Cleaned data directory not found: {self.cleaned_dir}")
+        if not self.chroma_dir.exists():
+            raise FileNotFoundError(f"ChromaDB directory not found: {self.chroma_dir}")
+    
+        # Exact FAISS copies of the collections, built on first query
+        self._vector_indexes = {}
+        self._vector_indexes_lock = threading.Lock()
+    
+        # Query embeddings memoized per instance (a method-level lru_cache
+        # would key on self and keep every tools object alive)
+        self._embed = lru_cache(maxsize=1024)(self._embed_uncached)
+    
+    # ========================================================================
+    # LAZY-LOADED RESOURCES
+    # ========================================================================
+    
+    @locked_cached_property
+    def embedding_model(self):
+        """Query embedding model (int8 ONNX if available, else SentenceTransformer)."""
+        logger.info("📥 Loading embedding model...")
+        torch.set_num_threads(EMBEDDING_NUM_THREADS)
+        try:
+            torch.set_num_interop_threads(EMBEDDING_INTEROP_THREADS)
+        except RuntimeError:
+            pass  # Can only be set once per process, before any parallel work
+        if HAS_ONNX:
+            return QuantizedEmbeddingModel(
+                self.project_root / "vector_db" / "onnx" / "all-MiniLM-L6-v2-int8"
+            )
+        return SentenceTransformer('all-MiniLM-L6-v2')
+    
+    @locked_cached_property
+    def chroma_client(self):
+        """Persistent ChromaDB client."""
+        logger.info("🔧 Connecting to ChromaDB...")
+        return chromadb.PersistentClient(
+            path=str(self.chroma_dir),
+            settings=Settings(anonymized_telemetry=False)
+        )
+    
+    def _load_collection(self, name: str):
+        """Open a ChromaDB collection, or return None if it has not been built."""
+        try:
+            collection = self.chroma_client.get_collection(name)
+            logger.info("✓ Loaded %s collection", name)
+            return collection
+        except ValueError:
+            logger.warning("⚠️ %s collection not found. Run embedding notebook first.", name)
+            return None
+    
+    @locked_cached_property
+    def _collections(self) -> Dict[str, Any]:
+        """All three collections, opened concurrently (index loads are independent I/O)."""
+        names = ("investigation_cases", "fraud_patterns", "kyc_profiles")
+        self.chroma_client  # Create the client once, before the worker threads need it
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            return dict(zip(names, executor.map(self._load_collection, names)))
+    
+    @locked_cached_property
+    def cases_collection(self):
+        return self._collections["investigation_cases"]
+    
+    @locked_cached_property
+    def patterns_collection(self):
+        return self._collections["fraud_patterns"]
+    
+    @locked_cached_property
+    def kyc_collection(self):
+        return self._collections["kyc_profiles"]
+    
+    @locked_cached_property
+    def df_transactions(self) -> pd.DataFrame:
+        """Transactions, indexed by TransactionID (the column is kept)."""
+        try:
+            df = _read_parquet(self.cleaned_dir / "creditcard_cleaned.parquet", TRANSACTION_COLUMNS)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Transaction data not found: {self.cleaned_dir / 'creditcard_cleaned.parquet'}")
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+        # Amount stays float64: it is summed and reported as money
+        _downcast(
+            df,
+            [f"V{i}" for i in range(1, 29)] + ['amount_log', 'amount_zscore'],
+            ['hour', 'day_of_week', 'is_weekend', 'is_night', 'Class']
+        )
+        # Index by ID so lookups are hash-based, not full scans
+        df.set_index('TransactionID', drop=False, inplace=True)
+        df.index.name = None
+        logger.info("✓ Loaded %d transactions", len(df))
+        return df
+    
+    @locked_cached_property
+    def _v_cols(self) -> List[str]:
+        """PCA feature columns present in the transaction data."""
+        return [f"V{i}" for i in range(1, 29) if f"V{i}" in self.df_transactions.columns]
+    
+    @locked_cached_property
+    def _v_positions(self) -> List[int]:
+        """Column positions of the PCA features, for one-shot row extraction."""
+        return [self.df_transactions.columns.get_loc(c) for c in self._v_cols]
+    
+    @locked_cached_property
+    def df_siem(self) -> pd.DataFrame:
+        """SIEM log, sorted by timestamp so time windows are a binary search away."""
+        try:
+            df = _read_parquet(self.cleaned_dir / "siem_logs_cleaned.parquet", SIEM_COLUMNS)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"SIEM data not found: {self.cleaned_dir / 'siem_logs_cleaned.parquet'}")
+        if 'timestamp' in df.columns:
+            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df = df.sort_values('timestamp').reset_index(drop=True)
+        _to_category(df, ['user_id', 'device_id', 'event_type', 'severity', 'country', 'geo_country'])
+        logger.info("✓ Loaded %d SIEM logs", len(df))
+        return df
+    
+    @locked_cached_property
+    def _siem_ts(self) -> Optional[np.ndarray]:
+        """Sorted SIEM timestamps as datetime64 values (None without a timestamp column)."""
+        if 'timestamp' not in self.df_siem.columns:
+            return None
+        return self.df_siem['timestamp'].values
+    
+    @locked_cached_property
+    def _siem_end(self) -> int:
+        """Number of SIEM rows with a timestamp (NaT rows sort last)."""
+        return int(self.df_siem['timestamp'].notna().sum())
+    
+    @locked_cached_property
+    def _siem_flag_cumsums(self) -> Dict[str, np.ndarray]:
+        """Prefix sums of the risk flags (leading 0), so any row range is counted in O(1)."""
+        return {
+            column: np.concatenate([[0], self.df_siem[column].fillna(0).astype(np.int64).cumsum().values])
+            for column in ('is_high_risk', 'is_suspicious')
+            if column in self.df_siem.columns
+        }
+    
+    @locked_cached_property
+    def _siem_indexes(self) -> Dict[str, Dict[Any, np.ndarray]]:
+        """Row positions per filter value, so filtered queries touch only matching rows."""
+        return {
+            column: self.df_siem.groupby(column, sort=False, observed=True).indices
+            for column in ('user_id', 'device_id', 'event_type')
+            if column in self.df_siem.columns
+        }
+    
+    @locked_cached_property
+    def _kyc_tbl(self) -> pa.Table:
+        """KYC profiles as an Arrow table (categorical columns dictionary-encoded)."""
+        path = self.cleaned_dir / "kyc_profiles_cleaned.parquet"
+        try:
+            available = set(pq.read_schema(path).names)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"KYC data not found: {path}")
+        table = pq.read_table(
+            path,
+            columns=[c for c in KYC_COLUMNS if c in available],
+            read_dictionary=[c for c in ('risk_level', 'country', 'employment', 'account_type') if c in available]
+        )
+        logger.info("✓ Loaded %d KYC profiles", table.num_rows)
+        return table
+    
+    @locked_cached_property
+    def _kyc_positions(self) -> Dict[str, int]:
+        """Row position of each user_id in the KYC table (first occurrence wins)."""
+        positions = {}
+        for i, uid in enumerate(self._kyc_tbl.column('user_id').to_pylist()):
+            positions.setdefault(uid, i)
+        return positions
+    
+    def _kyc_row(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """One KYC profile as a plain dict, converting only that row out of Arrow."""
+        position = self._kyc_positions.get(user_id)
+        if position is None:
+            return None
+        return self._kyc_tbl.slice(position, 1).to_pylist()[0]
+    
+    @locked_cached_property
+    def df_kyc(self) -> pd.DataFrame:
+        """KYC profiles as a DataFrame indexed by user_id (the tools use the Arrow table)."""
+        df = self._kyc_tbl.to_pandas()
+        df.set_index('user_id', drop=False, inplace=True)
+        df.index.name = None
+        return df
+    
+    # ========================================================================
+    # HELPERS
+    # ========================================================================
+    
+    def _embed_uncached(self, text: str) -> np.ndarray:
+        """
+        Encode a query string (called through self._embed, memoized per text).
+        
+        Agents often repeat the same lookup within a session, so identical
+        queries skip the transformer forward pass and go straight to ChromaDB.
+        The cached array is shared between callers and marked read-only.
+        """
+        embedding = self.embedding_model.encode(text)
+        embedding.flags.writeable = False
+        return embedding
+    
+    def _query_collection(
+        self,
+        collection,
+        query_embedding: np.ndarray,
+        n_results: int,
+        where: Optional[Dict[str, Any]]
+    ) -> Dict[str, list]:
+        """Query a collection through its FAISS index, or ChromaDB if there is none."""
+        index = self._vector_indexes.get(collection.name)
+        if index is None and HAS_FAISS:
+            with self._vector_indexes_lock:
+                index = self._vector_indexes.get(collection.name)
+                if index is None:
+                    index = self._vector_indexes[collection.name] = FlatVectorIndex(collection)
+        if index is not None:
+            return index.query(query_embedding, n_results=n_results, where=where)
+        return collection.query(
+            query_embeddings=[query_embedding.tolist()],
+            n_results=n_results,
+            where=where
+        )
+    
+    def warmup(self) -> None:
+        """
+        Pay the one-off model and index start-up costs ahead of the first query.
+        
+        Runs a dummy encode (first-call init, and the weight transfer when
+        on GPU) and a 1-result query against each available collection, so
+        an agent's first tool call sees steady-state latency.
+        """
+        logger.info("🔥 Warming up embedding model and vector indexes...")
+        embedding = np.asarray(self.embedding_model.encode(["warmup"], show_progress_bar=False))[0]
+        for collection in (self.cases_collection, self.patterns_collection, self.kyc_collection):
+            if collection is not None:
+                self._query_collection(collection, embedding, n_results=1, where=None)
     
     # ========================================================================
     # TOOL 1: QUERY SIMILAR CASES
@@ -142,33 +668,29 @@ def __init__(self):
                 )
         """
         # Generate embedding for the query
-        query_embedding = self.embedding_model.encode(description)
+        query_embedding = self._embed(description)
         
         # Build metadata filter
         where_clause = {"fraud_type": fraud_type_filter} if fraud_type_filter else None
         
-        # Search ChromaDB
-        results = self.cases_collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=n_results,
-            where=where_clause
-        )
+        # Search the collection
+        results = self._query_collection(self.cases_collection, query_embedding, n_results, where_clause)
         
-        # Format results
+        # Format results (similarities computed for all rows at once)
+        similarities = np.round(1.0 / (1.0 + np.asarray(results['distances'][0])), 3).tolist()
         similar_cases = []
-        for i, (doc, meta, distance) in enumerate(zip(
+        for i, (doc, meta, similarity) in enumerate(zip(
             results['documents'][0],
             results['metadatas'][0],
-            results['distances'][0]
+            similarities
         )):
-            similarity = 1 / (1 + distance)  
             similar_cases.append({
                 "rank": i + 1,
                 "case_id": meta.get('case_id', 'Unknown'),
                 "fraud_type": meta.get('fraud_type', 'Unknown'),
                 "status": meta.get('status', 'Unknown'),
-                "similarity_score": round(similarity, 3),
-                "summary": doc[:200] + "..." if len(doc) > 200 else doc
+                "similarity_score": similarity,
+                "summary": doc if len(doc) <= 200 else doc[:200] + "..."
             })
         
         return {
@@ -207,32 +729,28 @@ def __init__(self):
                 )
         """
         # Generate embedding
-        query_embedding = self.embedding_model.encode(indicators)
+        query_embedding = self._embed(indicators)
         
         # Build filter
         where_clause = {"risk_level": risk_level_filter} if risk_level_filter else None
         
         # Search patterns
-        results = self.patterns_collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=n_results,
-            where=where_clause
-        )
+        results = self._query_collection(self.patterns_collection, query_embedding, n_results, where_clause)
         
-        # Format results
+        # Format results (similarities computed for all rows at once)
+        similarities = np.round(1.0 / (1.0 + np.asarray(results['distances'][0])), 3).tolist()
         matching_patterns = []
-        for i, (doc, meta, distance) in enumerate(zip(
+        for i, (doc, meta, similarity) in enumerate(zip(
             results['documents'][0],
             results['metadatas'][0],
-            results['distances'][0]
+            similarities
         )):
-            similarity = 1 / (1 + distance)
             matching_patterns.append({
                 "rank": i + 1,
                 "pattern_name": meta.get('name', 'Unknown'),
                 "risk_level": meta.get('risk_level', 'Unknown'),
-                "match_score": round(similarity, 3),
-                "description": doc[:300] + "..." if len(doc) > 300 else doc
+                "match_score": similarity,
+                "description": doc if len(doc) <= 300 else doc[:300] + "..."
             })
         
         return {
@@ -260,32 +778,29 @@ def __init__(self):
         Example:
             >>> tools.fetch_kyc_profile("USER_12345")
         """
-        # Search in KYC dataframe
-        profile = self.df_kyc[self.df_kyc['user_id'] == user_id]
+        # Look up the profile row (hash lookup + one-row Arrow slice)
+        profile = self._kyc_row(user_id)
         
-        if profile.empty:
+        if profile is None:
             return {
                 "found": False,
                 "user_id": user_id,
                 "message": "No KYC profile found for this user"
             }
         
-        # Extract profile data
-        profile = profile.iloc[0]
-        
         return {
             "found": True,
             "user_id": user_id,
             "full_name": profile.get('full_name', 'N/A'),
-            "age": int(profile.get('age', 0)),
+            "age": profile.get('age', 0),
             "country": profile.get('country', 'N/A'),
             "employment": profile.get('employment', 'N/A'),
             "account_type": profile.get('account_type', 'N/A'),
-            "risk_score": int(profile.get('risk_score', 0)),
+            "risk_score": profile.get('risk_score', 0),
             "risk_level": profile.get('risk_level', 'N/A'),
-            "avg_monthly_transactions": int(profile.get('avg_monthly_txn', 0)),
-            "device_count": int(profile.get('device_count', 0)),
-            "account_age_days": int(profile.get('account_age_days', 0)) if 'account_age_days' in profile else None,
+            "avg_monthly_transactions": profile.get('avg_monthly_txn', 0),
+            "device_count": profile.get('device_count', 0),
+            "account_age_days": profile.get('account_age_days'),
             "profile_summary": profile.get('profile_text', 'No summary available')
         }
     
@@ -322,50 +837,49 @@ def __init__(self):
                     hours_back=48
                 )
         """
-        # Start with full dataset
-        df = self.df_siem.copy()
-        
-        # Apply filters
-        if user_id:
-            df = df[df['user_id'] == user_id]
-        
-        if device_id:
-            df = df[df['device_id'] == device_id]
-        
-        if event_type:
-            df = df[df['event_type'] == event_type]
-        
-        # Time filter (if timestamp column exists)
-        if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            cutoff_time = datetime.now() - timedelta(hours=hours_back)
-            df = df[df['timestamp'] >= cutoff_time]
+        # Apply filters by intersecting precomputed row positions
+        positions = None
+        window = None
+        for column, value in (('user_id', user_id), ('device_id', device_id), ('event_type', event_type)):
+            if value:
+                rows = self._siem_indexes[column].get(value, np.empty(0, dtype=np.intp))
+                positions = rows if positions is None else np.intersect1d(positions, rows, assume_unique=True)
         
-        # Sort by most recent
-        if 'timestamp' in df.columns:
-            df = df.sort_values('timestamp', ascending=False)
+        # Time filter + most-recent-first ordering (if timestamp column exists).
+        # The log is sorted by timestamp, so the window is [start, end) in row order.
+        if self._siem_ts is not None:
+            cutoff_time = np.datetime64(datetime.now() - timedelta(hours=hours_back))
+            start = int(np.searchsorted(self._siem_ts, cutoff_time))
+            end = self._siem_end
+            if positions is None:
+                window = (max(start, end - limit), end)
+                positions = np.arange(*window)
+            else:
+                lo, hi = np.searchsorted(positions, [start, end])
+                positions = positions[max(lo, hi - limit):hi]
+            positions = positions[::-1]
         
         # Limit results
-        df = df.head(limit)
+        if positions is None:
+            df = self.df_siem.head(limit)
+        else:
+            df = self.df_siem.iloc[positions[:limit]]
         
         # Format events
-        events = []
-        for _, row in df.iterrows():
-            events.append({
-                "event_id": row.get('event_id', 'N/A'),
-                "timestamp": str(row.get('timestamp', 'N/A')),
-                "event_type": row.get('event_type', 'N/A'),
-                "severity": row.get('severity', 'N/A'),
-                "user_id": row.get('user_id', 'N/A'),
-                "device_id": row.get('device_id', 'N/A'),
-                "ip_address": row.get('ip_address', 'N/A'),
-                "country": row.get('country', row.get('geo_country', 'N/A')),
-                "details": row.get('details_reason', 'No details available')
-            })
+        events = _to_records(df, SIEM_EVENT_FIELDS)
         
-        # Calculate statistics
-        high_risk_count = df['is_high_risk'].sum() if 'is_high_risk' in df.columns else 0
-        suspicious_count = df['is_suspicious'].sum() if 'is_suspicious' in df.columns else 0
+        # Calculate statistics (a contiguous window is two prefix-sum loads)
+        counts = {}
+        for column in ('is_high_risk', 'is_suspicious'):
+            if column not in df.columns:
+                counts[column] = 0
+            elif window is not None:
+                cumsum = self._siem_flag_cumsums[column]
+                counts[column] = cumsum[window[1]] - cumsum[window[0]]
+            else:
+                counts[column] = df[column].sum()
+        high_risk_count = counts['is_high_risk']
+        suspicious_count = counts['is_suspicious']
         
         return {
             "filters_applied": {
@@ -399,10 +913,10 @@ def __init__(self):
         Example:
             >>> tools.get_transaction_details("TXN_00012345")
         """
-        # Search transaction
-        txn = self.df_transactions[self.df_transactions['TransactionID'] == transaction_id]
-        
-        if txn.empty:
+        # Look up transaction (indexed by TransactionID)
+        try:
+            txn = self.df_transactions.loc[[transaction_id]]
+        except KeyError:
             return {
                 "found": False,
                 "transaction_id": transaction_id,
@@ -410,20 +924,22 @@ def __init__(self):
             }
         
         txn = txn.iloc[0]
+        # float32 columns are rounded, so widening them adds no spurious digits
+        pca_values = txn.to_numpy()[self._v_positions].astype(float).round(FLOAT32_RESULT_DECIMALS)
         
         return {
             "found": True,
             "transaction_id": transaction_id,
-            "amount": float(txn.get('Amount', 0)),
+            "amount": txn.get('Amount', 0),
             "timestamp": str(txn.get('timestamp', 'N/A')),
-            "hour": int(txn.get('hour', 0)),
-            "day_of_week": int(txn.get('day_of_week', 0)),
+            "hour": txn.get('hour', 0),
+            "day_of_week": txn.get('day_of_week', 0),
             "is_weekend": bool(txn.get('is_weekend', False)),
             "is_night": bool(txn.get('is_night', False)),
-            "amount_log": float(txn.get('amount_log', 0)),
-            "amount_zscore": float(txn.get('amount_zscore', 0)),
+            "amount_log": round(float(txn.get('amount_log', 0)), FLOAT32_RESULT_DECIMALS),
+            "amount_zscore": round(float(txn.get('amount_zscore', 0)), FLOAT32_RESULT_DECIMALS),
             "is_fraud": bool(txn.get('Class', 0)),
-            "pca_features": {f"V{i}": float(txn.get(f"V{i}", 0)) for i in range(1, 29)}
+            "pca_features": dict(zip(self._v_cols, pca_values.tolist()))
         }
     
     # ========================================================================
@@ -455,16 +971,17 @@ def __init__(self):
         # For demo purposes, we'll return random sample
         # In production, we would filter by user_id using a mapping table
         
-        df = self.df_transactions.copy()
+        df = self.df_transactions
         
-        # Time filter
+        # Time filter + limit (timestamps are parsed once at load time).
+        # Only the first `limit` matching rows are materialized, rather than
+        # copying every match and then taking head().
         if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
             cutoff = datetime.now() - timedelta(days=days_back)
-            df = df[df['timestamp'] >= cutoff]
-        
-        # Limit and sample
-        df = df.head(limit)
+            matches = np.flatnonzero((df['timestamp'] >= cutoff).to_numpy())
+            df = df.iloc[matches[:limit]]
+        else:
+            df = df.head(limit)
         
         # Calculate statistics
         stats = {
@@ -481,15 +998,7 @@ def __init__(self):
             "user_id": user_id or "N/A",
             "days_searched": days_back,
             "statistics": stats,
-            "sample_transactions": [
-                {
-                    "transaction_id": row.get('TransactionID', 'N/A'),
-                    "amount": float(row.get('Amount', 0)),
-                    "timestamp": str(row.get('timestamp', 'N/A')),
-                    "is_fraud": bool(row.get('Class', 0))
-                }
-                for _, row in df.head(10).iterrows()
-            ]
+            "sample_transactions": _to_records(df.head(10), TRANSACTION_SAMPLE_FIELDS)
         }
     
     # ========================================================================
@@ -522,34 +1031,30 @@ def __init__(self):
                 )
         """
         # Generate embedding
-        query_embedding = self.embedding_model.encode(description)
+        query_embedding = self._embed(description)
         
         # Build filter
         where_clause = {"risk_level": risk_level_filter} if risk_level_filter else None
         
         # Search
-        results = self.kyc_collection.query(
-            query_embeddings=[query_embedding.tolist()],
-            n_results=n_results,
-            where=where_clause
-        )
+        results = self._query_collection(self.kyc_collection, query_embedding, n_results, where_clause)
         
-        # Format results
+        # Format results (similarities computed for all rows at once)
+        similarities = np.round(1.0 / (1.0 + np.asarray(results['distances'][0])), 3).tolist()
         similar_profiles = []
-        for i, (doc, meta, distance) in enumerate(zip(
+        for i, (doc, meta, similarity) in enumerate(zip(
             results['documents'][0],
             results['metadatas'][0],
-            results['distances'][0]
+            similarities
         )):
-            similarity = 1 / (1 + distance)
             similar_profiles.append({
                 "rank": i + 1,
                 "user_id": meta.get('user_id', 'Unknown'),
                 "risk_score": int(meta.get('risk_score', 0)),
                 "risk_level": meta.get('risk_level', 'Unknown'),
                 "country": meta.get('country', 'Unknown'),
-                "similarity_score": round(similarity, 3),
-                "profile_summary": doc[:200] + "..." if len(doc) > 200 else doc
+                "similarity_score": similarity,
+                "profile_summary": doc if len(doc) <= 200 else doc[:200] + "..."
             })
         
         return {
@@ -690,6 +1195,8 @@ def get_tool_descriptions() -> List[Dict[str, Any]]:
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    
     # Test the tools
     print("="*80)
     print("TESTING FRAUD AGENT TOOLS")
@@ -700,11 +1207,11 @@ if __name__ == "__main__":
     # Test 1: Query similar cases
     print("\n🔍 Test 1: Query Similar Cases")
     result = tools.query_similar_cases("Password reset followed by unusual transfer")
-    print(json.dumps(result, indent=2))
+    print(to_json(result, indent=True))
     
     # Test 2: Search fraud patterns
     print("\n🎯 Test 2: Search Fraud Patterns")
     result = tools.search_fraud_patterns("Multiple small transactions in short time")
-    print(json.dumps(result, indent=2))
+    print(to_json(result, indent=True))
     
     print("\n✅ Tool tests complete!")
\ No newline at end of file
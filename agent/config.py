@@ -6,11 +6,14 @@ Central configuration file for the fraud investigation agent.
 """
 
 import os
+import time
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Load environment variables (once per process, even if this module is reloaded)
+if not os.environ.get("_FRAUD_AGENT_DOTENV_LOADED"):
+    load_dotenv()
+    os.environ["_FRAUD_AGENT_DOTENV_LOADED"] = "1"
 
 # ============================================================================
 # API CONFIGURATION
@@ -21,7 +24,7 @@ def get_api_key():
     try:
         import streamlit as st
         return st.secrets.get("GOOGLE_API_KEY")
-    except:
+    except (ImportError, AttributeError, FileNotFoundError):
         return os.getenv("GOOGLE_API_KEY")
 
 GOOGLE_API_KEY = get_api_key()
@@ -51,6 +54,10 @@ SIEM_DIR = OUTPUTS_DIR / "siem_logs"
 GEMINI_MODEL = "gemini-2.5-pro"
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 MAX_INVESTIGATION_TURNS = 10
+MAX_CONCURRENT_INVESTIGATIONS = 4  # Alerts investigated in parallel by process_alert_queue
+TOOL_CACHE_SIZE = 1024  # Cached read-only tool results per agent
+TOOL_CACHE_TTL_SECONDS = 300
+LARGE_TOOL_RESULT_CHARS = 16_384  # Bigger tool results are stored under investigations/blobs/
 
 # ============================================================================
 # CONFIDENCE THRESHOLDS
@@ -63,6 +70,25 @@ CONFIDENCE_THRESHOLDS = {
     "DISMISS": 0.00
 }
 
+# ============================================================================
+# FAST-PATH RULES (alerts decided without an LLM investigation)
+# ============================================================================
+
+FAST_PATH_ENABLED = True
+# Scores at or below this, with a routine description, are set to MONITOR
+FAST_PATH_MONITOR_MAX_SCORE = 0.20
+FAST_PATH_MONITOR_PATTERNS = (
+    "high-risk merchant category",
+    "card-not-present transaction spike",
+)
+# Scores at or above this, with a takeover-style description, are ESCALATEd
+FAST_PATH_ESCALATE_MIN_SCORE = 0.95
+FAST_PATH_ESCALATE_PATTERNS = (
+    "new device",
+    "account takeover",
+    "velocity check failed",
+)
+
 # ============================================================================
 # DASHBOARD CONFIGURATION
 # ============================================================================
@@ -161,6 +187,31 @@ After your investigation, provide a structured brief with:
 Begin your investigation now.
 """
 
+# ============================================================================
+# BATCH TRIAGE PROMPT TEMPLATE
+# ============================================================================
+
+# Low-risk alerts below this initial score can be triaged in batches
+BATCH_TRIAGE_THRESHOLD = 0.5
+BATCH_TRIAGE_SIZE = 8
+
+BATCH_TRIAGE_PROMPT_TEMPLATE = """
+LOW-RISK ALERT TRIAGE
+=====================
+
+**Triage Date:** {investigation_date}
+
+The following alerts were flagged with a low initial ML risk score. Triage
+each one from its description and score alone (no tools are available).
+
+**Alerts:**
+{alert_list}
+
+**Expected Output Format:**
+Respond with ONLY a JSON array, one object per alert, in the same order:
+[{{"transaction_id": "...", "recommendation": "ESCALATE|VERIFY|MONITOR|DISMISS", "confidence": 0.XX, "rationale": "..."}}]
+"""
+
 # ============================================================================
 # LOGGING CONFIGURATION
 # ============================================================================
@@ -173,39 +224,72 @@ LOG_FILE = OUTPUTS_DIR / "agent_logs.txt"
 # DATA VALIDATION
 # ============================================================================
 
+# Re-check the filesystem at most this often (dashboard reruns call validate_config)
+VALIDATION_TTL_SECONDS = 5.0
+_validation_cache = {"checked_at": None, "issues": []}
+
+
+def _list_dir(directory):
+    """Names of the entries in a directory (empty if it does not exist)."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.name for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
 def validate_config():
     """
     Validate configuration and check required files exist.
     Returns list of warnings/errors.
+    
+    Results are reused for VALIDATION_TTL_SECONDS before the filesystem
+    is probed again.
     """
+    checked_at = _validation_cache["checked_at"]
+    if checked_at is not None and time.monotonic() - checked_at < VALIDATION_TTL_SECONDS:
+        return list(_validation_cache["issues"])
+    
     issues = []
     
     # Check API key
     if not GOOGLE_API_KEY:
         issues.append("⚠️ GOOGLE_API_KEY not set. Set in .env file or environment variable.")
     
+    # One directory listing per parent instead of one stat per path
+    base_entries = _list_dir(BASE_DIR)
+    outputs_entries = _list_dir(OUTPUTS_DIR)
+    cleaned_entries = _list_dir(CLEANED_DIR)
+    
     # Check required directories
-    required_dirs = [DATA_DIR, OUTPUTS_DIR, CLEANED_DIR, EMBEDDINGS_DIR]
-    for directory in required_dirs:
-        if not directory.exists():
+    required_dirs = [
+        (DATA_DIR, base_entries),
+        (OUTPUTS_DIR, base_entries),
+        (CLEANED_DIR, outputs_entries),
+        (EMBEDDINGS_DIR, outputs_entries)
+    ]
+    for directory, entries in required_dirs:
+        if directory.name not in entries:
             issues.append(f"⚠️ Directory not found: {directory}")
     
     # Check required data files
     required_files = [
-        CLEANED_DIR / "creditcard_cleaned.parquet",
-        CLEANED_DIR / "siem_logs_cleaned.parquet",
-        CLEANED_DIR / "kyc_profiles_cleaned.parquet"
+        "creditcard_cleaned.parquet",
+        "siem_logs_cleaned.parquet",
+        "kyc_profiles_cleaned.parquet"
     ]
     
-    for file_path in required_files:
-        if not file_path.exists():
-            issues.append(f"⚠️ Required file not found: {file_path}")
+    for file_name in required_files:
+        if file_name not in cleaned_entries:
+            issues.append(f"⚠️ Required file not found: {CLEANED_DIR / file_name}")
     
     # Check ChromaDB
-    if not VECTOR_DB_DIR.exists():
+    if VECTOR_DB_DIR.name not in base_entries:
         issues.append(f"⚠️ ChromaDB directory not found: {VECTOR_DB_DIR}")
     
-    return issues
+    _validation_cache["checked_at"] = time.monotonic()
+    _validation_cache["issues"] = issues
+    return list(issues)
 
 
 def print_config():
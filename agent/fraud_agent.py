@@ -13,11 +13,101 @@ The agent:
 """
 
 import anthropic
-import json
+import logging
 import os
-from typing import Dict, List, Any, Optional
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from agent.agent_tools import FraudAgentTools, get_tool_descriptions
+from agent import config
+from agent.agent_tools import FraudAgentTools, brief_regex, get_tool_descriptions, parse_brief, to_json
+
+logger = logging.getLogger(__name__)
+
+
+# Tool schemas never change at runtime, so build them once for all agents
+_TOOL_DESCRIPTIONS = get_tool_descriptions()
+
+# Tool methods on FraudAgentTools the agent is allowed to dispatch to
+_ALLOWED_TOOLS = frozenset({
+    "query_similar_cases",
+    "search_fraud_patterns",
+    "fetch_kyc_profile",
+    "query_siem_events",
+    "get_transaction_details",
+    "get_transaction_history",
+})
+
+# Upper bound on tool calls run at once within a single turn
+MAX_TOOL_WORKERS = 4
+
+# Tool results from the last N turns are resent in full; older ones as a preview
+KEEP_FULL_TOOL_TURNS = 2
+TOOL_RESULT_PREVIEW_CHARS = 300
+
+# Opening user message for an investigation (filled in with str.format)
+_USER_PROMPT_TEMPLATE = """Investigate this suspicious transaction:
+
+Transaction ID: {transaction_id}
+Alert Reason: {alert_description}
+Initial Risk Score: {initial_risk_score:.2f}
+
+Please conduct a thorough fraud investigation using available tools. 
+
+After gathering sufficient evidence, provide your investigation brief in this format:
+
+INVESTIGATION BRIEF
+==================
+Case ID: {transaction_id}
+Investigation Date: {investigation_date}
+
+SUMMARY:
+[One paragraph summary of what you found]
+
+EVIDENCE:
+1. [Evidence point 1]
+2. [Evidence point 2]
+3. [Evidence point 3]
+...
+
+FRAUD INDICATORS:
+- [Specific red flags identified]
+
+SIMILAR CASES:
+[Brief mention of any similar past cases]
+
+CONFIDENCE ASSESSMENT:
+Score: [0.0-1.0]
+Reasoning: [Why this confidence level]
+
+RECOMMENDATION: [ESCALATE | VERIFY | MONITOR | DISMISS]
+Reasoning: [Why this action is appropriate]
+
+Begin your investigation now."""
+
+# The RECOMMENDATION line, confidence score and other action mentions, in one pass
+# (the score sits on the line after "CONFIDENCE ASSESSMENT:", as "Score: 0.85")
+_BRIEF_RE = brief_regex(r"(?i:confidence assessment)[\s*:]*(?i:score)")
+
+
+# One client (httpx connection pool + TLS context) per API key, shared by all agents
+_CLIENTS: Dict[str, anthropic.Anthropic] = {}
+
+
+def _get_client(api_key: str) -> anthropic.Anthropic:
+    """Return the shared Anthropic client for this API key, creating it on first use."""
+    client = _CLIENTS.get(api_key)
+    if client is None:
+        client = _CLIENTS[api_key] = anthropic.Anthropic(api_key=api_key)
+    return client
+
+
+@lru_cache(maxsize=None)
+def _get_tools() -> FraudAgentTools:
+    """One FraudAgentTools (datasets, ChromaDB handle) shared by every agent in the process."""
+    logger.info("🔧 Initializing fraud agent tools...")
+    return FraudAgentTools()
 
 
 class FraudInvestigationAgent:
@@ -43,13 +133,11 @@ class FraudInvestigationAgent:
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY not found. Set environment variable or pass api_key parameter.")
         
-        self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.client = _get_client(self.api_key)
         self.model = "claude-sonnet-4-20250514"
         
-        # Initialize tools
-        print("🔧 Initializing fraud agent tools...")
-        self.tools = FraudAgentTools()
-        self.tool_descriptions = get_tool_descriptions()
+        # Tools are created on first dispatch (see the tools property)
+        self.tool_descriptions = _TOOL_DESCRIPTIONS
         
         # System prompt for the agent
         self.system_prompt = """You are an expert fraud investigation agent for a financial institution.
@@ -80,7 +168,7 @@ Output Requirements:
 
 Be professional, objective, and always explain your reasoning."""
         
-        print("✅ Fraud Investigation Agent initialized\n")
+        logger.info("✅ Fraud Investigation Agent initialized")
     
     def investigate(
         self,
@@ -101,55 +189,23 @@ Be professional, objective, and always explain your reasoning."""
         Returns:
             Complete investigation brief with recommendation
         """
-        print("="*80)
-        print(f"🔍 STARTING INVESTIGATION: {transaction_id}")
-        print("="*80)
-        print(f"Alert: {alert_description}")
-        print(f"Initial Risk Score: {initial_risk_score:.2f}")
-        print()
+        started_at = datetime.now()
+        
+        logger.info(
+            "🔍 STARTING INVESTIGATION: %s | Alert: %s | Initial Risk Score: %.2f",
+            transaction_id, alert_description, initial_risk_score
+        )
         
         # Start conversation
         messages = [
             {
                 "role": "user",
-                "content": f"""Investigate this suspicious transaction:
-
-Transaction ID: {transaction_id}
-Alert Reason: {alert_description}
-Initial Risk Score: {initial_risk_score:.2f}
-
-Please conduct a thorough fraud investigation using available tools. 
-
-After gathering sufficient evidence, provide your investigation brief in this format:
-
-INVESTIGATION BRIEF
-==================
-Case ID: {transaction_id}
-Investigation Date: {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
-SUMMARY:
-[One paragraph summary of what you found]
-
-EVIDENCE:
-1. [Evidence point 1]
-2. [Evidence point 2]
-3. [Evidence point 3]
-...
-
-FRAUD INDICATORS:
-- [Specific red flags identified]
-
-SIMILAR CASES:
-[Brief mention of any similar past cases]
-
-CONFIDENCE ASSESSMENT:
-Score: [0.0-1.0]
-Reasoning: [Why this confidence level]
-
-RECOMMENDATION: [ESCALATE | VERIFY | MONITOR | DISMISS]
-Reasoning: [Why this action is appropriate]
-
-Begin your investigation now."""
+                "content": _USER_PROMPT_TEMPLATE.format(
+                    transaction_id=transaction_id,
+                    alert_description=alert_description,
+                    initial_risk_score=initial_risk_score,
+                    investigation_date=started_at.strftime('%Y-%m-%d %H:%M')
+                )
             }
         ]
         
@@ -159,7 +215,7 @@ Begin your investigation now."""
         
         while turn_count < max_turns:
             turn_count += 1
-            print(f"\n--- Turn {turn_count}/{max_turns} ---")
+            logger.info("--- Turn %d/%d ---", turn_count, max_turns)
             
             # Call Claude with tools
             response = self.client.messages.create(
@@ -177,68 +233,73 @@ Begin your investigation now."""
             if stop_reason == "tool_use":
                 # Agent wants to call tools
                 tool_results = []
+                tool_calls = [
+                    content_block for content_block in response.content
+                    if content_block.type == "tool_use"
+                ]
                 
-                for content_block in response.content:
-                    if content_block.type == "tool_use":
-                        tool_name = content_block.name
-                        tool_input = content_block.input
-                        tool_use_id = content_block.id
-                        
-                        print(f"🔧 Agent calling: {tool_name}")
-                        print(f"   Input: {json.dumps(tool_input, indent=2)}")
-                        
-                        # Execute tool
-                        result = self._execute_tool(tool_name, tool_input)
-                        
-                        print(f"   ✅ Result received")
-                        
-                        # Log the tool call
-                        investigation_log.append({
-                            "turn": turn_count,
-                            "tool": tool_name,
-                            "input": tool_input,
-                            "result": result
-                        })
-                        
-                        # Add tool result to messages
-                        tool_results.append({
-                            "type": "tool_result",
-                            "tool_use_id": tool_use_id,
-                            "content": json.dumps(result)
-                        })
+                for content_block in tool_calls:
+                    logger.info("🔧 Agent calling: %s", content_block.name)
+                    logger.debug("   Input: %s", content_block.input)
+                
+                # Execute tools (calls in the same turn are independent, so run them together)
+                results = self._execute_tools(
+                    [(content_block.name, content_block.input) for content_block in tool_calls]
+                )
+                
+                for content_block, result in zip(tool_calls, results):
+                    logger.info("   ✅ Result received: %s", content_block.name)
+                    
+                    # Log the tool call
+                    investigation_log.append({
+                        "turn": turn_count,
+                        "tool": content_block.name,
+                        "input": content_block.input,
+                        "result": result
+                    })
+                    
+                    # Add tool result to messages
+                    tool_results.append({
+                        "type": "tool_result",
+                        "tool_use_id": content_block.id,
+                        "content": to_json(result)
+                    })
                 
                 # Add assistant's tool use and tool results to conversation
                 messages.append({"role": "assistant", "content": response.content})
                 messages.append({"role": "user", "content": tool_results})
                 
+                # Keep the request size bounded as the investigation goes on
+                self._compact_tool_results(messages)
+                
             elif stop_reason == "end_turn":
                 # Agent has finished reasoning and provided final answer
-                final_response = ""
-                for content_block in response.content:
-                    if hasattr(content_block, "text"):
-                        final_response += content_block.text
+                final_response = "".join(
+                    content_block.text
+                    for content_block in response.content
+                    if hasattr(content_block, "text")
+                )
                 
-                print("\n" + "="*80)
-                print("📋 INVESTIGATION COMPLETE")
-                print("="*80)
-                print(final_response)
+                logger.info("📋 INVESTIGATION COMPLETE: %s", transaction_id)
+                logger.debug("%s", final_response)
                 
                 # Parse the investigation brief
                 investigation_brief = self._parse_investigation_brief(
                     final_response,
                     transaction_id,
-                    investigation_log
+                    investigation_log,
+                    started_at
                 )
                 
                 return investigation_brief
             
             else:
                 # Unexpected stop reason
-                print(f"⚠️ Unexpected stop reason: {stop_reason}")
+                logger.warning("⚠️ Unexpected stop reason: %s", stop_reason)
                 break
         
         # Max turns reached
-        print(f"\n⚠️ Max turns ({max_turns}) reached. Ending investigation.")
+        logger.warning("⚠️ %s: max turns (%d) reached", transaction_id, max_turns)
         
         return {
             "status": "incomplete",
@@ -247,6 +308,50 @@ Begin your investigation now."""
             "investigation_log": investigation_log
         }
     
+    @cached_property
+    def tools(self) -> FraudAgentTools:
+        """Shared FraudAgentTools, built the first time this agent dispatches a tool."""
+        return _get_tools()
+    
+    def _compact_tool_results(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Shorten tool results older than the last KEEP_FULL_TOOL_TURNS turns (in place).
+        
+        Every turn resends the whole conversation, so without this the
+        uploaded tool output grows with each turn. Older results keep a
+        short preview; the tool_result blocks themselves stay so every
+        tool_use still has its matching result.
+        
+        Args:
+            messages: Conversation so far
+        """
+        tool_turns = [
+            message for message in messages
+            if message["role"] == "user" and isinstance(message["content"], list)
+        ]
+        for message in tool_turns[:-KEEP_FULL_TOOL_TURNS]:
+            for block in message["content"]:
+                content = block["content"]
+                if len(content) > TOOL_RESULT_PREVIEW_CHARS and not content.endswith(" chars elided]"):
+                    elided = len(content) - TOOL_RESULT_PREVIEW_CHARS
+                    block["content"] = f"{content[:TOOL_RESULT_PREVIEW_CHARS]}... [{elided} chars elided]"
+    
+    def _execute_tools(self, tool_calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """
+        Execute the tool calls from one turn, concurrently when there are several.
+        
+        Args:
+            tool_calls: (tool_name, tool_input) pairs
+            
+        Returns:
+            Tool results, in the same order as tool_calls
+        """
+        self.tools  # Build the shared tools once, before any worker thread needs them
+        if len(tool_calls) <= 1:
+            return [self._execute_tool(name, tool_input) for name, tool_input in tool_calls]
+        with ThreadPoolExecutor(max_workers=min(len(tool_calls), MAX_TOOL_WORKERS)) as executor:
+            return list(executor.map(lambda call: self._execute_tool(*call), tool_calls))
+    
     def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> Any:
         """
         Execute a tool function and return the result.
@@ -258,22 +363,13 @@ Begin your investigation now."""
         Returns:
             Tool execution result
         """
-        # Map tool names to functions
-        tool_map = {
-            "query_similar_cases": self.tools.query_similar_cases,
-            "search_fraud_patterns": self.tools.search_fraud_patterns,
-            "fetch_kyc_profile": self.tools.fetch_kyc_profile,
-            "query_siem_events": self.tools.query_siem_events,
-            "get_transaction_details": self.tools.get_transaction_details,
-            "get_transaction_history": self.tools.get_transaction_history,
-        }
-        
-        if tool_name not in tool_map:
+        # Only the tools exposed to the model may be called
+        if tool_name not in _ALLOWED_TOOLS:
             return {"error": f"Unknown tool: {tool_name}"}
         
         try:
             # Call the tool function
-            result = tool_map[tool_name](**tool_input)
+            result = getattr(self.tools, tool_name)(**tool_input)
             return result
         except Exception as e:
             return {"error": str(e)}
@@ -282,7 +378,8 @@ Begin your investigation now."""
         self,
         response_text: str,
         transaction_id: str,
-        investigation_log: List[Dict]
+        investigation_log: List[Dict],
+        investigation_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Parse the agent's final response into structured format.
@@ -290,34 +387,19 @@ Begin your investigation now."""
         Args:
             response_text: Agent's text response
             investigation_log: Log of all tool calls made
+            investigation_date: When the investigation started (default: now)
             
         Returns:
             Structured investigation brief
         """
-        # Extract confidence score
-        confidence = 0.5  # Default
-        if "Confidence" in response_text or "Score:" in response_text:
-            import re
-            match = re.search(r"Score:\s*(0\.\d+|1\.0)", response_text)
-            if match:
-                confidence = float(match.group(1))
-        
-        # Extract recommendation
-        recommendation = "VERIFY"  # Default
-        for action in ["ESCALATE", "VERIFY", "MONITOR", "DISMISS"]:
-            if action in response_text:
-                recommendation = action
-                break
+        recommendation, confidence = parse_brief(response_text, _BRIEF_RE)
         
         # Count tool calls by type
-        tools_used = {}
-        for log_entry in investigation_log:
-            tool = log_entry["tool"]
-            tools_used[tool] = tools_used.get(tool, 0) + 1
+        tools_used = dict(Counter(log_entry["tool"] for log_entry in investigation_log))
         
         return {
             "case_id": transaction_id,
-            "investigation_date": datetime.now().isoformat(),
+            "investigation_date": (investigation_date or datetime.now()).isoformat(),
             "recommendation": recommendation,
             "confidence_score": confidence,
             "investigation_brief": response_text,
@@ -333,6 +415,8 @@ Begin your investigation now."""
 # ============================================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+    
     # Example investigation
     agent = FraudInvestigationAgent()
     
@@ -347,7 +431,7 @@ if __name__ == "__main__":
     print("\n" + "="*80)
     print("INVESTIGATION RESULT")
     print("="*80)
-    print(json.dumps(result, indent=2, default=str))
+    print(to_json(result, indent=True))
     
     print(f"\n✅ Investigation complete!")
     print(f"   Recommendation: {result['recommendation']}")
@@ -7,13 +7,107 @@ Pipeline:
 """
 
 import google.generativeai as genai
-import json
+import atexit
+import inspect
+import logging
 import os
-from typing import Dict, List, Any, Optional
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from agent import config
-from agent.agent_tools import FraudAgentTools, get_tool_descriptions
+from agent.agent_tools import (
+    RECOMMENDATIONS, FraudAgentTools, brief_regex, from_json, get_tool_descriptions, parse_brief, to_json
+)
+
+try:
+    from cachetools import TTLCache
+except ImportError:
+    TTLCache = None  # _FallbackTTLCache is used instead
+
+logger = logging.getLogger(__name__)
+
+# The RECOMMENDATION line, confidence score and other action mentions, in one pass
+# (the score label may be bold, as in "**CONFIDENCE SCORE:** 0.85")
+_BRIEF_RE = brief_regex(r"(?i:confidence score)")
+
+# Read-only tools whose results are stable for the cache TTL (SIEM queries
+# look back from "now" in hours, so they always run fresh)
+CACHEABLE_TOOLS = frozenset({
+    "query_similar_cases",
+    "search_fraud_patterns",
+    "fetch_kyc_profile",
+    "get_transaction_details",
+    "get_transaction_history",
+})
+
+class _FallbackTTLCache:
+    """Minimal stand-in for cachetools.TTLCache (get, in, item assignment)."""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value), oldest first
+    
+    def _expire(self):
+        now = time.monotonic()
+        while self._data and next(iter(self._data.values()))[0] <= now:
+            self._data.popitem(last=False)
+    
+    def get(self, key, default=None):
+        self._expire()
+        entry = self._data.get(key)
+        return entry[1] if entry is not None else default
+    
+    def __contains__(self, key) -> bool:
+        self._expire()
+        return key in self._data
+    
+    def __setitem__(self, key, value):
+        self._expire()
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+def _strip_code_fence(text: str) -> str:
+    """Remove a surrounding ```json ... ``` fence from a model reply, if present."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.split("\n", 1)[1] if "\n" in text else ""
+        text = text.rsplit("```", 1)[0]
+    return text.strip()
+
+
+def _write_atomic(filepath: Path, text: str):
+    """Write a file via a temp file + rename, so readers never see a partial file."""
+    tmp_path = filepath.with_name(filepath.name + ".tmp")
+    try:
+        tmp_path.write_text(text)
+        os.replace(tmp_path, filepath)
+    except OSError as e:
+        logger.error("❌ Could not save %s: %s", filepath, e)
+        tmp_path.unlink(missing_ok=True)
+        return
+    logger.info("💾 Investigation saved: %s", filepath)
+
+
+def _summarize_result(result: Any) -> Any:
+    """Scalar fields of a tool result, with lists/dicts reduced to their sizes."""
+    if not isinstance(result, dict):
+        return {"type": type(result).__name__}
+    summary = {}
+    for key, value in result.items():
+        if isinstance(value, (list, dict)):
+            summary[f"{key}_count"] = len(value)
+        else:
+            summary[key] = value
+    return summary
 
 
 class FraudInvestigationAgent:
@@ -44,21 +138,34 @@ class FraudInvestigationAgent:
         # Store system prompt to prepend to first message instead
         self.system_prompt = config.SYSTEM_PROMPT
         
+        # Recent results of read-only tools, shared across investigations
+        self._tool_cache = (TTLCache or _FallbackTTLCache)(maxsize=config.TOOL_CACHE_SIZE, ttl=config.TOOL_CACHE_TTL_SECONDS)
+        self._tool_cache_lock = threading.Lock()
+        
         # Initialize tools
-        print("🔧 Initializing fraud agent tools...")
+        logger.info("🔧 Initializing fraud agent tools...")
         try:
             self.tools = FraudAgentTools()
-            print("✅ Tools initialized successfully")
+            logger.info("✅ Tools initialized successfully")
         except Exception as e:
-            print(f"⚠️ Warning: Could not initialize all tools: {e}")
-            print("   Some features may be limited.")
+            logger.warning("⚠️ Could not initialize all tools, some features may be limited: %s", e)
             self.tools = None
         
+        # Tool name -> bound method, built once
+        self._tool_map = {} if self.tools is None else {
+            "query_similar_cases": self.tools.query_similar_cases,
+            "search_fraud_patterns": self.tools.search_fraud_patterns,
+            "fetch_kyc_profile": self.tools.fetch_kyc_profile,
+            "query_siem_events": self.tools.query_siem_events,
+            "get_transaction_details": self.tools.get_transaction_details,
+            "get_transaction_history": self.tools.get_transaction_history,
+        }
+        
         # Convert tool descriptions to Gemini format
         # this converter was added to preserve compatibility since my tools were originally written in Anthropic-style, but I switched my agent to run on Google Gemini
         self.gemini_tools = self._convert_tools_to_gemini_format()
         
-        print(f"✅ Agent initialized with {config.GEMINI_MODEL}\n")
+        logger.info("✅ Agent initialized with %s", config.GEMINI_MODEL)
     
     def _convert_tools_to_gemini_format(self) -> List[Dict]:
         """
@@ -100,18 +207,46 @@ class FraudInvestigationAgent:
         Returns:
             Complete investigation brief
         """
+        for event, payload in self.investigate_stream(
+            transaction_id, alert_description, initial_risk_score, max_turns
+        ):
+            if event == "result":
+                return payload
+    
+    def investigate_stream(
+        self,
+        transaction_id: str,
+        alert_description: str,
+        initial_risk_score: float = 0.5,
+        max_turns: int = None
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Conduct a full fraud investigation, yielding progress as it happens.
+        
+        Events are (name, payload) pairs:
+        - ("turn", turn number)
+        - ("text", chunk of model text, as it is generated)
+        - ("tool_call", {"name": ..., "input": ...})
+        - ("tool_result", {"name": ...})
+        - ("result", investigation brief or error/incomplete dict), always last
+        
+        Args:
+            transaction_id: ID of suspicious transaction
+            alert_description: Why transaction was flagged
+            initial_risk_score: Initial ML model score
+            max_turns: Max reasoning cycles (default from config)
+        """
         if max_turns is None:
             max_turns = config.MAX_INVESTIGATION_TURNS
         
-        print("="*80)
-        print(f"🔍 STARTING INVESTIGATION: {transaction_id}")
-        print("="*80)
-        print(f"Alert: {alert_description}")
-        print(f"Initial Risk Score: {initial_risk_score:.2f}")
-        print()
+        logger.info(
+            "🔍 STARTING INVESTIGATION: %s | Alert: %s | Initial Risk Score: %.2f",
+            transaction_id, alert_description, initial_risk_score
+        )
         
         # Format investigation prompt with system prompt prepended
-        investigation_date = datetime.now().strftime('%Y-%m-%d %H:%M')
+        started_at = datetime.now()
+        investigation_date = started_at.strftime('%Y-%m-%d %H:%M')
         investigation_prompt = config.INVESTIGATION_PROMPT_TEMPLATE.format(
             transaction_id=transaction_id,
             alert_description=alert_description,
@@ -119,85 +254,83 @@ class FraudInvestigationAgent:
             investigation_date=investigation_date
         )
         
-        # Combine system prompt with investigation prompt
+        # Start chat session with the system prompt prepended to the first message
         prompt = f"{self.system_prompt}\n\n{investigation_prompt}"
-        
-        # Start chat session (compatible with older versions)
         chat = self.model.start_chat()
         
         investigation_log = []
         turn_count = 0
         
         # Send initial prompt
+        yield ("turn", 1)
         try:
-            response = chat.send_message(prompt)
+            response = yield from self._send_streaming(chat, prompt)
         except Exception as e:
-            print(f"❌ Error sending message: {e}")
-            return {
+            logger.error("❌ Error sending message: %s", e)
+            yield ("result", {
                 "status": "error",
                 "transaction_id": transaction_id,
                 "error": str(e)
-            }
+            })
+            return
         
         # Investigation loop
         while turn_count < max_turns:
             turn_count += 1
-            print(f"\n--- Turn {turn_count}/{max_turns} ---")
+            logger.info("--- %s: Turn %d/%d ---", transaction_id, turn_count, max_turns)
             
-            # Check if we have function calls
-            has_function_calls = False
+            # Collect function calls from the response in one pass
             try:
-                # Check for function calls in response
-                for part in response.candidates[0].content.parts:
-                    if hasattr(part, 'function_call') and part.function_call:
-                        has_function_calls = True
-                        break
+                tool_calls = [
+                    (part.function_call.name, dict(part.function_call.args))
+                    for part in response.candidates[0].content.parts
+                    if getattr(part, 'function_call', None)
+                ]
             except (AttributeError, IndexError) as e:
-                print(f"⚠️ Warning parsing response: {e}")
-                has_function_calls = False
+                logger.warning("⚠️ Warning parsing response: %s", e)
+                tool_calls = []
             
-            if has_function_calls:
+            if tool_calls:
                 # Model wants to use tools
                 function_responses = []
                 
-                for part in response.candidates[0].content.parts:
-                    if hasattr(part, 'function_call') and part.function_call:
-                        function_call = part.function_call
-                        tool_name = function_call.name
-                        tool_args = dict(function_call.args)
-                        
-                        print(f"🔧 Agent calling: {tool_name}")
-                        print(f"   Input: {json.dumps(tool_args, indent=2)}")
-                        
-                        # Execute tool
-                        result = self._execute_tool(tool_name, tool_args)
-                        
-                        print(f"   ✅ Result received")
-                        
-                        # Log
-                        investigation_log.append({
-                            "turn": turn_count,
-                            "tool": tool_name,
-                            "input": tool_args,
-                            "result": result
-                        })
-                        
-                        # Create function response
-                        function_responses.append({
-                            "name": tool_name,
-                            "response": result
-                        })
+                for tool_name, tool_args in tool_calls:
+                    logger.info("🔧 Agent calling: %s", tool_name)
+                    logger.debug("   Input: %s", tool_args)
+                    yield ("tool_call", {"name": tool_name, "input": tool_args})
+                
+                # Execute tools (calls in the same turn are independent, so run them together)
+                results = self._execute_tools(tool_calls)
+                
+                for (tool_name, tool_args), result in zip(tool_calls, results):
+                    logger.info("   ✅ Result received: %s", tool_name)
+                    yield ("tool_result", {"name": tool_name})
+                    
+                    # Log
+                    investigation_log.append({
+                        "turn": turn_count,
+                        "tool": tool_name,
+                        "input": tool_args,
+                        "result": result
+                    })
+                    
+                    # Create function response
+                    function_responses.append({
+                        "name": tool_name,
+                        "response": result
+                    })
                 
                 # Send function results back - format as text for compatibility
                 function_results_text = "Tool Results:\n\n"
                 for fr in function_responses:
                     function_results_text += f"Tool: {fr['name']}\n"
-                    function_results_text += f"Result: {json.dumps(fr['response'], indent=2)}\n\n"
+                    function_results_text += f"Result: {to_json(fr['response'])}\n\n"
                 
+                yield ("turn", turn_count + 1)
                 try:
-                    response = chat.send_message(function_results_text)
+                    response = yield from self._send_streaming(chat, function_results_text)
                 except Exception as e:
-                    print(f"❌ Error sending function results: {e}")
+                    logger.error("❌ Error sending function results: %s", e)
                     break
                 
             else:
@@ -205,76 +338,167 @@ class FraudInvestigationAgent:
                 try:
                     final_response = response.text
                 except Exception as e:
-                    print(f"⚠️ Could not extract text: {e}")
+                    logger.warning("⚠️ Could not extract text: %s", e)
                     final_response = str(response)
                 
-                print("\n" + "="*80)
-                print("📋 INVESTIGATION COMPLETE")
-                print("="*80)
-                print(final_response)
+                logger.info("📋 INVESTIGATION COMPLETE: %s", transaction_id)
+                logger.debug("%s", final_response)
                 
                 # Parse brief
                 investigation_brief = self._parse_investigation_brief(
                     final_response,
                     transaction_id,
-                    investigation_log
+                    investigation_log,
+                    started_at
                 )
                 
-                return investigation_brief
+                yield ("result", investigation_brief)
+                return
         
         # Max turns reached
-        print(f"\n⚠️ Max turns ({max_turns}) reached")
-        return {
+        logger.warning("⚠️ %s: max turns (%d) reached", transaction_id, max_turns)
+        yield ("result", {
             "status": "incomplete",
             "transaction_id": transaction_id,
             "message": "Investigation incomplete - max turns reached",
             "investigation_log": investigation_log
-        }
+        })
+    
+    def _send_streaming(self, chat, message: str):
+        """
+        Send a chat message with streaming, yielding ("text", chunk) events.
+        
+        Returns (via yield from) the fully resolved response, so callers can
+        inspect its parts exactly as with a blocking send_message.
+        """
+        response = chat.send_message(message, stream=True)
+        for chunk in response:
+            try:
+                text = chunk.text
+            except (ValueError, AttributeError):
+                continue  # Chunk carries no text (e.g. a function call)
+            if text:
+                yield ("text", text)
+        return response
+    
+    def _execute_tools(self, tool_calls: List[Tuple[str, Dict[str, Any]]]) -> List[Any]:
+        """Execute one turn's tool calls, concurrently when there are several (results in order)."""
+        if len(tool_calls) <= 1:
+            return [self._execute_tool(name, tool_input) for name, tool_input in tool_calls]
+        with ThreadPoolExecutor(max_workers=len(tool_calls)) as executor:
+            return list(executor.map(lambda call: self._execute_tool(*call), tool_calls))
     
     def _execute_tool(self, tool_name: str, tool_input: Dict[str, Any]) -> Any:
         """Execute a tool function."""
         if self.tools is None:
             return {"error": "Tools not initialized"}
         
-        tool_map = {
-            "query_similar_cases": self.tools.query_similar_cases,
-            "search_fraud_patterns": self.tools.search_fraud_patterns,
-            "fetch_kyc_profile": self.tools.fetch_kyc_profile,
-            "query_siem_events": self.tools.query_siem_events,
-            "get_transaction_details": self.tools.get_transaction_details,
-            "get_transaction_history": self.tools.get_transaction_history,
-        }
-        
+        tool_map = self._tool_map
         if tool_name not in tool_map:
             return {"error": f"Unknown tool: {tool_name}"}
         
+        # Read-only lookups are served from the result cache when possible
+        if tool_name in CACHEABLE_TOOLS:
+            cache_key = self._tool_cache_key(tool_name, tool_map[tool_name], tool_input)
+            with self._tool_cache_lock:
+                cached = self._tool_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            return self._call_tool(tool_map[tool_name], tool_input, cache_key)
+        return self._call_tool(tool_map[tool_name], tool_input, None)
+    
+    def _tool_cache_key(self, tool_name: str, func, tool_input: Dict[str, Any]) -> Tuple[str, str]:
+        """Cache key for a tool call, with defaults filled in so equivalent calls match."""
+        try:
+            bound = inspect.signature(func).bind(**tool_input)
+            bound.apply_defaults()
+            arguments = bound.arguments
+        except TypeError:
+            arguments = tool_input  # Bad arguments: the call itself will report the error
+        return (tool_name, to_json(arguments, sort_keys=True))
+    
+    def _call_tool(self, func, tool_input: Dict[str, Any], cache_key: Optional[Tuple[str, str]]) -> Any:
+        """Run a tool, caching successful results under cache_key (if given)."""
+        try:
+            result = func(**tool_input)
+        except Exception as e:
+            result = {"error": str(e)}
+        
+        if cache_key is not None and not (isinstance(result, dict) and "error" in result):
+            with self._tool_cache_lock:
+                self._tool_cache[cache_key] = result
+        return result
+    
+    def triage_batch(self, alerts: List[Dict[str, Any]]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Triage several low-risk alerts with a single Gemini request (no tools).
+        
+        Args:
+            alerts: Alert dicts with transaction_id, description, risk_score
+            
+        Returns:
+            One brief per alert (same order and shape as investigate(), with
+            no tool calls), or None if the model's reply could not be used
+        """
+        started_at = datetime.now()
+        alert_list = "\n".join(
+            f"{i}. Transaction ID: {alert['transaction_id']} | "
+            f"Alert: {alert['description']} | Initial Risk Score: {alert['risk_score']:.2f}"
+            for i, alert in enumerate(alerts, 1)
+        )
+        triage_prompt = config.BATCH_TRIAGE_PROMPT_TEMPLATE.format(
+            investigation_date=started_at.strftime('%Y-%m-%d %H:%M'),
+            alert_list=alert_list
+        )
+        
+        logger.info("🗂️ Triaging %d low-risk alerts in one request", len(alerts))
         try:
-            result = tool_map[tool_name](**tool_input)
-            return result
+            response = self.model.generate_content(f"{self.system_prompt}\n\n{triage_prompt}")
+            entries = from_json(_strip_code_fence(response.text))
         except Exception as e:
-            return {"error": str(e)}
+            logger.warning("⚠️ Batch triage failed, falling back to full investigations: %s", e)
+            return None
+        
+        # Every alert must come back exactly once with a valid recommendation
+        by_id = {
+            entry.get("transaction_id"): entry
+            for entry in entries
+            if isinstance(entry, dict) and entry.get("recommendation") in RECOMMENDATIONS
+        } if isinstance(entries, list) else {}
+        if any(alert["transaction_id"] not in by_id for alert in alerts):
+            logger.warning("⚠️ Batch triage reply incomplete, falling back to full investigations")
+            return None
+        
+        briefs = []
+        for alert in alerts:
+            entry = by_id[alert["transaction_id"]]
+            try:
+                confidence = min(max(float(entry.get("confidence", 0.5)), 0.0), 1.0)
+            except (TypeError, ValueError):
+                confidence = 0.5
+            briefs.append({
+                "case_id": alert["transaction_id"],
+                "investigation_date": started_at.isoformat(),
+                "recommendation": entry["recommendation"],
+                "confidence_score": confidence,
+                "investigation_brief": str(entry.get("rationale", "")),
+                "tools_used": {},
+                "total_tool_calls": 0,
+                "investigation_log": [],
+                "status": "complete",
+                "mode": "batch_triage"
+            })
+        return briefs
     
     def _parse_investigation_brief(
         self,
         response_text: str,
         transaction_id: str,
-        investigation_log: List[Dict]
+        investigation_log: List[Dict],
+        investigation_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
-        """Parse agent's response into structured format."""
-        import re
-        
-        # Extract confidence score
-        confidence = 0.5
-        match = re.search(r"Score:\s*(0\.\d+|1\.0)", response_text)
-        if match:
-            confidence = float(match.group(1))
-        
-        # Extract recommendation
-        recommendation = "VERIFY"
-        for action in ["ESCALATE", "VERIFY", "MONITOR", "DISMISS"]:
-            if action in response_text:
-                recommendation = action
-                break
+        """Parse agent's response into structured format (dated investigation_date, default now)."""
+        recommendation, confidence = parse_brief(response_text, _BRIEF_RE)
         
         # Count tools used
         tools_used = {}
@@ -284,7 +508,7 @@ class FraudInvestigationAgent:
         
         return {
             "case_id": transaction_id,
-            "investigation_date": datetime.now().isoformat(),
+            "investigation_date": (investigation_date or datetime.now()).isoformat(),
             "recommendation": recommendation,
             "confidence_score": confidence,
             "investigation_brief": response_text,
@@ -306,6 +530,12 @@ class InvestigationWorkflow:
         self.agent = FraudInvestigationAgent()
         self.results_dir = config.OUTPUTS_DIR / "investigations"
         self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.blobs_dir = self.results_dir / "blobs"
+        
+        # Investigation files are written off the calling thread; pending
+        # writes are flushed before the interpreter exits
+        self._save_executor = ThreadPoolExecutor(max_workers=2)
+        atexit.register(self._save_executor.shutdown)
     
     def process_alert(
         self,
@@ -326,69 +556,228 @@ class InvestigationWorkflow:
         Returns:
             Investigation results
         """
+        for event, payload in self.process_alert_stream(
+            transaction_id, alert_description, initial_risk_score, save_results
+        ):
+            if event == "result":
+                return payload
+    
+    def process_alert_stream(
+        self,
+        transaction_id: str,
+        alert_description: str,
+        initial_risk_score: float,
+        save_results: bool = True
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Process a single fraud alert, yielding the agent's progress events.
+        
+        Same as process_alert, but passes through the events of
+        FraudInvestigationAgent.investigate_stream (the last one is
+        ("result", ...)) so a UI can show the brief as it is written.
+        """
+        # Obvious cases are decided by rule, without calling the model
+        fast_result = self._fast_path_result(transaction_id, alert_description, initial_risk_score)
+        if fast_result is not None:
+            if save_results:
+                self._save_investigation(fast_result)
+            yield ("result", fast_result)
+            return
+        
         # Run investigation
-        result = self.agent.investigate(
+        for event, payload in self.agent.investigate_stream(
             transaction_id=transaction_id,
             alert_description=alert_description,
             initial_risk_score=initial_risk_score
-        )
+        ):
+            # Save results
+            if event == "result" and save_results and payload.get("status") == "complete":
+                # Keep big tool outputs out of the saved log (blobs sit beside it)
+                self._offload_large_results(payload)
+                self._save_investigation(payload)
+            yield event, payload
+    
+    def _fast_path_result(
+        self,
+        transaction_id: str,
+        alert_description: str,
+        initial_risk_score: float
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Decide clear-cut alerts by rule (see FAST-PATH RULES in config).
         
-        # Save results
-        if save_results and result.get("status") == "complete":
-            self._save_investigation(result)
+        Returns:
+            A brief shaped like investigate()'s, or None to investigate normally
+        """
+        if not config.FAST_PATH_ENABLED:
+            return None
+        
+        description = alert_description.lower()
+        if (initial_risk_score <= config.FAST_PATH_MONITOR_MAX_SCORE
+                and any(pattern in description for pattern in config.FAST_PATH_MONITOR_PATTERNS)):
+            recommendation = "MONITOR"
+        elif (initial_risk_score >= config.FAST_PATH_ESCALATE_MIN_SCORE
+                and any(pattern in description for pattern in config.FAST_PATH_ESCALATE_PATTERNS)):
+            recommendation = "ESCALATE"
+        else:
+            return None
+        
+        logger.info("⚡ Fast path: %s -> %s", transaction_id, recommendation)
+        return {
+            "case_id": transaction_id,
+            "investigation_date": datetime.now().isoformat(),
+            "recommendation": recommendation,
+            "confidence_score": initial_risk_score,
+            "investigation_brief": (
+                f"Decided by fast-path rule without an agent investigation: "
+                f"'{alert_description}' with initial risk score {initial_risk_score:.2f}."
+            ),
+            "tools_used": {},
+            "total_tool_calls": 0,
+            "investigation_log": [],
+            "status": "complete",
+            "fast_path": True
+        }
+    
+    def process_alert_batch(
+        self,
+        alerts: List[Dict[str, Any]],
+        batch_size: Optional[int] = None,
+        triage_threshold: Optional[float] = None,
+        save_results: bool = True,
+        max_concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Process alerts, triaging low-risk ones in batches.
         
-        return result
+        Alerts the fast path does not decide and that score below
+        triage_threshold are sent batch_size at a time in a single tool-less
+        Gemini request, which shares one system prompt across the batch.
+        Everything else, and any batch whose reply cannot be parsed, goes
+        through the full per-alert investigation, up to max_concurrency at once.
+        
+        Args:
+            alerts: List of alert dicts with transaction_id, description, risk_score
+            batch_size: Alerts per triage request (default from config)
+            triage_threshold: Risk score below which alerts are batch-triaged (default from config)
+            save_results: Whether to save results to file
+            max_concurrency: Requests in flight at once (default from config)
+            
+        Returns:
+            List of investigation results, in the same order as alerts
+        """
+        if batch_size is None:
+            batch_size = config.BATCH_TRIAGE_SIZE
+        if triage_threshold is None:
+            triage_threshold = config.BATCH_TRIAGE_THRESHOLD
+        if max_concurrency is None:
+            max_concurrency = config.MAX_CONCURRENT_INVESTIGATIONS
+        
+        results = [
+            self._fast_path_result(alert["transaction_id"], alert["description"], alert["risk_score"])
+            for alert in alerts
+        ]
+        low_risk = [
+            i for i, alert in enumerate(alerts)
+            if results[i] is None and alert["risk_score"] < triage_threshold
+        ]
+        batches = [low_risk[start:start + batch_size] for start in range(0, len(low_risk), batch_size)]
+        
+        def triage(batch):
+            return batch, self.agent.triage_batch([alerts[i] for i in batch])
+        
+        def investigate(i):
+            logger.info("Alert %d/%d", i + 1, len(alerts))
+            alert = alerts[i]
+            return self.process_alert(
+                transaction_id=alert["transaction_id"],
+                alert_description=alert["description"],
+                initial_risk_score=alert["risk_score"],
+                save_results=save_results
+            )
+        
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            for batch, briefs in executor.map(triage, batches):
+                if briefs is None:
+                    continue  # Left for full investigation below
+                for i, brief in zip(batch, briefs):
+                    results[i] = brief
+            
+            for i, result in enumerate(results):
+                if result is not None and save_results:
+                    self._save_investigation(result)
+            
+            remaining = [i for i, result in enumerate(results) if result is None]
+            for i, result in zip(remaining, executor.map(investigate, remaining)):
+                results[i] = result
+        
+        return results
     
     def process_alert_queue(
         self,
         alerts: List[Dict[str, Any]],
-        max_alerts: Optional[int] = None
+        max_alerts: Optional[int] = None,
+        max_concurrency: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Process multiple alerts from queue.
         
+        Investigations are independent and spend most of their time waiting
+        on Gemini, so up to max_concurrency of them run at once. Low-risk
+        alerts are triaged in batches first (see process_alert_batch).
+        
         Args:
             alerts: List of alert dicts with transaction_id, description, risk_score
             max_alerts: Max number to process
+            max_concurrency: Investigations in flight at once (default from config)
             
         Returns:
-            List of investigation results
+            List of investigation results, in the same order as alerts
         """
         if max_alerts:
             alerts = alerts[:max_alerts]
         
-        results = []
+        logger.info("📋 Processing %d alerts", len(alerts))
         
-        print(f"\n📋 Processing {len(alerts)} alerts...\n")
-        
-        for i, alert in enumerate(alerts, 1):
-            print(f"\n{'='*80}")
-            print(f"Alert {i}/{len(alerts)}")
-            print(f"{'='*80}")
-            
-            result = self.process_alert(
-                transaction_id=alert["transaction_id"],
-                alert_description=alert["description"],
-                initial_risk_score=alert["risk_score"]
-            )
-            
-            results.append(result)
+        results = self.process_alert_batch(alerts, max_concurrency=max_concurrency)
         
         # Generate summary
         self._print_summary(results)
         
         return results
     
+    def _offload_large_results(self, result: Dict[str, Any]):
+        """
+        Move large tool results out of the investigation log (in place).
+        
+        Results bigger than config.LARGE_TOOL_RESULT_CHARS (e.g. long SIEM
+        or transaction-history dumps) are written to results_dir/blobs/
+        and replaced in the log by {"_ref": path, "summary": ...}. The model
+        already saw the full result during the investigation; this only
+        keeps saved files small, so it runs only for results that are saved.
+        """
+        for log_entry in result.get("investigation_log", []):
+            result_json = to_json(log_entry["result"])
+            if len(result_json) <= config.LARGE_TOOL_RESULT_CHARS:
+                continue
+            
+            self.blobs_dir.mkdir(exist_ok=True)
+            blob_path = self.blobs_dir / f"{uuid.uuid4().hex}.json"
+            blob_path.write_text(result_json)
+            log_entry["result"] = {
+                "_ref": str(blob_path),
+                "summary": _summarize_result(log_entry["result"])
+            }
+    
     def _save_investigation(self, result: Dict[str, Any]):
         """Save investigation result to file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{result['case_id']}_{timestamp}.json"
+        # Name by the investigation's own date; the suffix keeps same-second saves apart
+        timestamp = datetime.fromisoformat(result["investigation_date"]).strftime("%Y%m%d_%H%M%S")
+        filename = f"{result['case_id']}_{timestamp}_{uuid.uuid4().hex[:8]}.json"
         filepath = self.results_dir / filename
         
-        with open(filepath, 'w') as f:
-            json.dump(result, f, indent=2, default=str)
-        
-        print(f"\n💾 Investigation saved: {filepath}")
+        # Serialize now (a snapshot of the result); the disk write happens in the background
+        self._save_executor.submit(_write_atomic, filepath, to_json(result, indent=True))
     
     def _print_summary(self, results: List[Dict[str, Any]]):
         """Print summary of processed alerts."""
@@ -423,6 +812,8 @@ class InvestigationWorkflow:
 # ============================================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=config.LOG_LEVEL, format=config.LOG_FORMAT)
+    
     # Example: Process a single alert
     workflow = InvestigationWorkflow()
     
@@ -16,12 +16,12 @@ Features:
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import json
 from pathlib import Path
+import random
 import sys
+from bisect import bisect_left
+from collections import deque
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent
@@ -30,6 +30,7 @@ sys.path.insert(0, str(project_root))
 # Import agent modules
 from agent import config
 from agent.investigation_workflow import InvestigationWorkflow
+from agent.agent_tools import to_json
 
 
 # ============================================================================
@@ -91,19 +92,49 @@ if 'current_investigation' not in st.session_state:
 if 'investigation_history' not in st.session_state:
     st.session_state.investigation_history = []
 
+# Per-investigation summary columns, kept as a DataFrame so stats and charts
+# don't rebuild a frame from the full history (logs included) on every rerun
+HISTORY_COLUMNS = ['case_id', 'investigation_date', 'recommendation', 'confidence_score', 'total_tool_calls']
+
+if 'history_df' not in st.session_state:
+    st.session_state.history_df = pd.DataFrame(columns=HISTORY_COLUMNS)
+
+# Newest-first view of the last few investigations for the home page
+RECENT_INVESTIGATIONS = 5
+
+if 'recent_investigations' not in st.session_state:
+    st.session_state.recent_investigations = deque(maxlen=RECENT_INVESTIGATIONS)
+
+# Chart figures keyed by name, with the history length they were built from
+if 'figures' not in st.session_state:
+    st.session_state.figures = {}
+
 if 'selected_alert' not in st.session_state:
     st.session_state.selected_alert = None
 
+if 'alert_seed' not in st.session_state:
+    st.session_state.alert_seed = 0
+
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+@st.cache_resource(show_spinner=False)
+def get_workflow():
+    """One InvestigationWorkflow (Gemini client, tools, vector stores) shared by all sessions."""
+    workflow = InvestigationWorkflow()
+    # Load the model and indexes behind the init spinner, not the first investigation
+    if workflow.agent.tools is not None:
+        workflow.agent.tools.warmup()
+    return workflow
+
+
 def initialize_workflow():
     """Initialize the investigation workflow."""
     try:
         with st.spinner("🔧 Initializing fraud detection agent..."):
-            workflow = InvestigationWorkflow()
+            workflow = get_workflow()
         st.session_state.workflow = workflow
         return True
     except Exception as e:
@@ -112,9 +143,27 @@ def initialize_workflow():
         return False
 
 
-def generate_sample_alerts(n=10):
-    """Generate sample fraud alerts for demo."""
-    import random
+def record_investigation(result):
+    """Add a finished investigation to the session history and its summary frame."""
+    st.session_state.investigation_history.append(result)
+    st.session_state.recent_investigations.appendleft(result)
+    row = pd.DataFrame([{column: result.get(column) for column in HISTORY_COLUMNS}])
+    row['investigation_date'] = pd.to_datetime(row['investigation_date'])
+    st.session_state.history_df = pd.concat(
+        [st.session_state.history_df, row] if len(st.session_state.history_df) else [row],
+        ignore_index=True
+    )
+
+
+# Risk badge per alert: <= 0.6 yellow, <= 0.8 orange, above that red
+RISK_EMOJI_THRESHOLDS = [0.6, 0.8]
+RISK_EMOJI = ["🟡", "🟠", "🔴"]
+
+
+@st.cache_data(show_spinner=False, ttl=300, max_entries=16)
+def generate_sample_alerts(n=10, seed=0):
+    """Generate sample fraud alerts for demo (same seed -> same queue)."""
+    rng = random.Random(seed)
     
     alert_types = [
         ("Large late-night transaction", 0.85),
@@ -129,15 +178,16 @@ def generate_sample_alerts(n=10):
     
     alerts = []
     for i in range(n):
-        description, base_risk = random.choice(alert_types)
-        risk = base_risk + random.uniform(-0.1, 0.1)
+        description, base_risk = rng.choice(alert_types)
+        risk = min(max(base_risk + rng.uniform(-0.1, 0.1), 0), 1)
         
         alerts.append({
-            "transaction_id": f"TXN_{random.randint(10000, 99999):05d}",
+            "transaction_id": f"TXN_{rng.randint(10000, 99999):05d}",
             "description": description,
-            "risk_score": min(max(risk, 0), 1),
-            "timestamp": datetime.now() - timedelta(hours=random.randint(0, 24)),
-            "amount": random.randint(100, 10000),
+            "risk_score": risk,
+            "risk_emoji": RISK_EMOJI[bisect_left(RISK_EMOJI_THRESHOLDS, risk)],
+            "timestamp": datetime.now() - timedelta(hours=rng.randint(0, 24)),
+            "amount": rng.randint(100, 10000),
             "status": "pending"
         })
     
@@ -188,11 +238,10 @@ with st.sidebar:
     st.subheader("Quick Stats")
     
     if st.session_state.investigation_history:
-        total_investigations = len(st.session_state.investigation_history)
-        escalated = sum(1 for inv in st.session_state.investigation_history 
-                       if inv.get('recommendation') == 'ESCALATE')
-        avg_confidence = sum(inv.get('confidence_score', 0) 
-                           for inv in st.session_state.investigation_history) / total_investigations
+        history_df = st.session_state.history_df
+        total_investigations = len(history_df)
+        escalated = int((history_df['recommendation'] == 'ESCALATE').sum())
+        avg_confidence = history_df['confidence_score'].fillna(0).mean()
         
         col1, col2 = st.columns(2)
         col1.metric("Total Cases", total_investigations)
@@ -216,18 +265,31 @@ with st.sidebar:
 
 
 # ============================================================================
-# MAIN PAGES
+# DASHBOARD FRAGMENTS
 # ============================================================================
 
-if page == "🏠 Dashboard":
-    # ========================================================================
-    # DASHBOARD HOME
-    # ========================================================================
-    
-    st.title("🏠 Fraud Investigation Dashboard")
-    st.markdown("Real-time fraud detection and investigation platform")
-    
-    # KPI Cards
+# Fragments rerun on their own instead of the whole script. They arrived
+# after the pinned Streamlit release, so fall back to plain functions there.
+fragment = (
+    getattr(st, "fragment", None)
+    or getattr(st, "experimental_fragment", None)
+    or (lambda func: func)
+)
+
+
+def _session_figure(name, build):
+    """Return this session's cached figure, rebuilding it only when the history has grown."""
+    n_investigations = len(st.session_state.history_df)
+    cached = st.session_state.figures.get(name)
+    if cached is None or cached[0] != n_investigations:
+        cached = (n_investigations, build())
+        st.session_state.figures[name] = cached
+    return cached[1]
+
+
+@fragment
+def _dashboard_kpis():
+    """Render the KPI metric row on the dashboard home."""
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -259,6 +321,63 @@ if page == "🏠 Dashboard":
             len(st.session_state.investigation_history),
             delta=f"+{len(st.session_state.investigation_history)}"
         )
+
+
+@fragment
+def _trend_pie():
+    """Render the recommendations pie chart."""
+    import plotly.express as px  # deferred: only chart pages pay for plotly
+    
+    st.subheader("📈 Investigation Trends")
+    if st.session_state.investigation_history:
+        fig = _session_figure('trend_pie', lambda: px.pie(
+            st.session_state.history_df,
+            names='recommendation',
+            title='Recommendations Distribution',
+            color_discrete_map={
+                'ESCALATE': '#ef4444',
+                'VERIFY': '#f59e0b',
+                'MONITOR': '#3b82f6',
+                'DISMISS': '#10b981'
+            }
+        ))
+        st.plotly_chart(fig, use_container_width=True, key='trend_pie')
+    else:
+        st.info("No data yet")
+
+
+@fragment
+def _confidence_hist():
+    """Render the confidence score histogram."""
+    import plotly.express as px
+    
+    st.subheader("🎯 Confidence Distribution")
+    if st.session_state.investigation_history:
+        fig = _session_figure('confidence_hist', lambda: px.histogram(
+            st.session_state.history_df,
+            x='confidence_score',
+            nbins=10,
+            title='Confidence Score Distribution'
+        ))
+        st.plotly_chart(fig, use_container_width=True, key='confidence_hist')
+    else:
+        st.info("No data yet")
+
+
+# ============================================================================
+# MAIN PAGES
+# ============================================================================
+
+if page == "🏠 Dashboard":
+    # ========================================================================
+    # DASHBOARD HOME
+    # ========================================================================
+    
+    st.title("🏠 Fraud Investigation Dashboard")
+    st.markdown("Real-time fraud detection and investigation platform")
+    
+    # KPI Cards
+    _dashboard_kpis()
     
     st.markdown("---")
     
@@ -266,7 +385,7 @@ if page == "🏠 Dashboard":
     st.subheader("📋 Recent Investigations")
     
     if st.session_state.investigation_history:
-        for inv in reversed(st.session_state.investigation_history[-5:]):
+        for inv in st.session_state.recent_investigations:
             with st.expander(
                 f"🔍 {inv['case_id']} - {inv['recommendation']} "
                 f"(Confidence: {inv['confidence_score']:.0%})"
@@ -283,37 +402,10 @@ if page == "🏠 Dashboard":
     col1, col2 = st.columns(2)
     
     with col1:
-        st.subheader("📈 Investigation Trends")
-        if st.session_state.investigation_history:
-            df = pd.DataFrame(st.session_state.investigation_history)
-            fig = px.pie(
-                df,
-                names='recommendation',
-                title='Recommendations Distribution',
-                color_discrete_map={
-                    'ESCALATE': '#ef4444',
-                    'VERIFY': '#f59e0b',
-                    'MONITOR': '#3b82f6',
-                    'DISMISS': '#10b981'
-                }
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No data yet")
+        _trend_pie()
     
     with col2:
-        st.subheader("🎯 Confidence Distribution")
-        if st.session_state.investigation_history:
-            df = pd.DataFrame(st.session_state.investigation_history)
-            fig = px.histogram(
-                df,
-                x='confidence_score',
-                nbins=10,
-                title='Confidence Score Distribution'
-            )
-            st.plotly_chart(fig, use_container_width=True)
-        else:
-            st.info("No data yet")
+        _confidence_hist()
 
 
 elif page == "📋 Alert Queue":
@@ -324,9 +416,8 @@ elif page == "📋 Alert Queue":
     st.title("📋 Fraud Alert Queue")
     st.markdown("Prioritized list of suspicious transactions requiring investigation")
     
-    # Generate sample alerts
-    if 'alerts' not in st.session_state:
-        st.session_state.alerts = generate_sample_alerts(15)
+    # Sample alerts (memoized per seed, so reruns reuse the same queue)
+    alerts = generate_sample_alerts(15, seed=st.session_state.alert_seed)
     
     # Filters
     col1, col2, col3 = st.columns(3)
@@ -336,38 +427,52 @@ elif page == "📋 Alert Queue":
         sort_by = st.selectbox("Sort By", ["Risk Score", "Amount", "Time"])
     with col3:
         if st.button("🔄 Refresh Alerts"):
-            st.session_state.alerts = generate_sample_alerts(15)
+            st.session_state.alert_seed += 1
             st.rerun()
     
-    # Filter alerts
-    filtered_alerts = [a for a in st.session_state.alerts if a['risk_score'] >= min_risk]
+    # Filter and sort as one table
+    sort_columns = {"Risk Score": "risk_score", "Amount": "amount", "Time": "timestamp"}
+    alerts_df = (
+        pd.DataFrame(alerts)
+        .query("risk_score >= @min_risk")
+        .sort_values(sort_columns[sort_by], ascending=False)
+        .reset_index(drop=True)
+    )
     
-    st.markdown(f"**Showing {len(filtered_alerts)} alerts**")
+    st.markdown(f"**Showing {len(alerts_df)} alerts**")
+    
+    # Alert table (a single element instead of a widget row per alert)
+    st.dataframe(
+        alerts_df[['risk_emoji', 'transaction_id', 'description', 'risk_score', 'amount', 'timestamp']],
+        column_config={
+            "risk_emoji": st.column_config.TextColumn(""),
+            "transaction_id": "Transaction",
+            "description": "Description",
+            "risk_score": st.column_config.ProgressColumn(
+                "Risk Score", format="%.2f", min_value=0.0, max_value=1.0
+            ),
+            "amount": st.column_config.NumberColumn("Amount", format="$%d"),
+            "timestamp": st.column_config.DatetimeColumn("Time", format="YYYY-MM-DD HH:mm"),
+        },
+        hide_index=True,
+        use_container_width=True
+    )
     
-    # Alert table
-    for alert in filtered_alerts:
-        risk_color = "🔴" if alert['risk_score'] > 0.8 else "🟠" if alert['risk_score'] > 0.6 else "🟡"
-        
-        with st.container():
-            col1, col2, col3, col4 = st.columns([3, 2, 1, 1])
-            
-            with col1:
-                st.markdown(f"**{alert['transaction_id']}**")
-                st.caption(alert['description'])
-            
-            with col2:
-                st.metric("Risk Score", f"{risk_color} {alert['risk_score']:.0%}")
-            
-            with col3:
-                st.metric("Amount", f"${alert['amount']:,}")
-            
-            with col4:
-                if st.button("🔎 Investigate", key=f"inv_{alert['transaction_id']}"):
-                    st.session_state.selected_alert = alert
-                    st.session_state.page = "🔎 Investigate"
-                    st.rerun()
-            
-            st.markdown("---")
+    if not alerts_df.empty:
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            selected_id = st.selectbox(
+                "Alert to investigate",
+                alerts_df['transaction_id'],
+                label_visibility="collapsed"
+            )
+        with col2:
+            if st.button("🔎 Investigate", use_container_width=True):
+                st.session_state.selected_alert = next(
+                    a for a in alerts if a['transaction_id'] == selected_id
+                )
+                st.session_state.page = "🔎 Investigate"
+                st.rerun()
 
 
 elif page == "🔎 Investigate":
@@ -410,15 +515,31 @@ elif page == "🔎 Investigate":
     if st.button("🚀 Start Investigation", type="primary", use_container_width=True):
         with st.spinner("🔍 Agent is investigating... This may take 1-2 minutes"):
             try:
-                result = st.session_state.workflow.process_alert(
+                # Show tool activity and the model's text as they arrive
+                status_placeholder = st.empty()
+                text_placeholder = st.empty()
+                streamed_text = ""
+                result = None
+                
+                for event, payload in st.session_state.workflow.process_alert_stream(
                     transaction_id=transaction_id,
                     alert_description=alert_description,
                     initial_risk_score=risk_score,
                     save_results=True
-                )
+                ):
+                    if event == "turn":
+                        streamed_text = ""
+                        status_placeholder.caption(f"Turn {payload}")
+                    elif event == "tool_call":
+                        status_placeholder.caption(f"🔧 Calling {payload['name']}...")
+                    elif event == "text":
+                        streamed_text += payload
+                        text_placeholder.markdown(streamed_text)
+                    elif event == "result":
+                        result = payload
                 
                 st.session_state.current_investigation = result
-                st.session_state.investigation_history.append(result)
+                record_investigation(result)
                 
                 st.success("✅ Investigation Complete!")
                 st.rerun()
@@ -490,7 +611,9 @@ elif page == "📊 Analytics":
         st.info("👋 No data yet. Complete some investigations to see analytics!")
         st.stop()
     
-    df = pd.DataFrame(st.session_state.investigation_history)
+    import plotly.express as px
+    
+    df = st.session_state.history_df
     
     # Summary metrics
     col1, col2, col3, col4 = st.columns(4)
@@ -509,11 +632,8 @@ elif page == "📊 Analytics":
     
     with col1:
         st.subheader("Recommendations Over Time")
-        df_time = df.copy()
-        df_time['investigation_date'] = pd.to_datetime(df_time['investigation_date'])
-        
         fig = px.scatter(
-            df_time,
+            df,
             x='investigation_date',
             y='confidence_score',
             color='recommendation',
@@ -526,16 +646,18 @@ elif page == "📊 Analytics":
     with col2:
         st.subheader("Tool Usage Distribution")
         
-        # Flatten tools_used
-        all_tools = []
-        for inv in st.session_state.investigation_history:
-            for tool, count in inv['tools_used'].items():
-                all_tools.extend([tool] * count)
+        # Total calls per tool across all investigations in one pass
+        tool_totals = (
+            pd.DataFrame([inv['tools_used'] for inv in st.session_state.investigation_history])
+            .fillna(0)
+            .sum(axis=0)
+            .astype(int)
+        )
+        tool_totals = tool_totals[tool_totals > 0].sort_values(ascending=False)
         
-        if all_tools:
-            tool_df = pd.DataFrame({'tool': all_tools})
+        if not tool_totals.empty:
             fig = px.bar(
-                tool_df['tool'].value_counts().reset_index(),
+                tool_totals.rename_axis('tool').reset_index(name='count'),
                 x='count',
                 y='tool',
                 orientation='h',
@@ -576,13 +698,16 @@ Vector DB: {config.VECTOR_DB_DIR}
     with col1:
         if st.button("🔄 Reset Investigation History"):
             st.session_state.investigation_history = []
+            st.session_state.recent_investigations.clear()
+            st.session_state.figures.clear()
+            st.session_state.history_df = pd.DataFrame(columns=HISTORY_COLUMNS)
             st.success("✅ History cleared")
     
     with col2:
         if st.button("📥 Export Data"):
             st.download_button(
                 "Download Investigations",
-                data=json.dumps(st.session_state.investigation_history, indent=2),
+                data=to_json(st.session_state.investigation_history, indent=True),
                 file_name="investigations.json",
                 mime="application/json"
             )
@@ -1,12 +1,16 @@
 # case_generator.py
-import random, json, os
+import random, os
+from contextlib import nullcontext
+from multiprocessing import Pool
+import numpy as np
+import orjson
 from tqdm import tqdm
 from faker import Faker
 import argparse
 
 fake = Faker()
 
-def generate_case():
+def generate_case(timestamp):
     """Simulated fraud investigation summary."""
     fraud_types = ["Account Takeover", "Phishing", "Transaction Laundering", "Card Skimming", "Identity Theft"]
     fraud = random.choice(fraud_types)
@@ -17,19 +21,67 @@ def generate_case():
         "investigator": fake.name(),
         "status": random.choice(["Open", "Under Review", "Closed"]),
         "actions_taken": random.choice(["Account frozen", "Customer contacted", "Escalated to compliance"]),
-        "timestamp": str(fake.date_time_this_year())
+        "timestamp": timestamp
     }
 
-def main(n_records, output_dir):
+def sample_timestamps(n, rng=None):
+    """Draw n timestamps between the start of this year and now, in one pass."""
+    rng = rng or np.random.default_rng()
+    now = np.datetime64("now", "s")
+    start = now.astype("datetime64[Y]").astype("datetime64[s]")
+    offsets = rng.integers(0, (now - start).astype(int) + 1, n).astype("timedelta64[s]")
+    return np.char.replace(np.datetime_as_string(start + offsets), "T", " ")
+
+def generate_chunk(task):
+    """Generate one (size, seed) chunk of cases (the unit of work handed to a worker).
+
+    random and Faker are reseeded from the chunk's own seed, so no two chunks repeat each other.
+    """
+    size, seed = task
+    rng = np.random.default_rng(seed)
+    chunk_seed = int(rng.integers(2**63))
+    random.seed(chunk_seed)
+    fake.seed_instance(chunk_seed)
+    return [generate_case(ts) for ts in sample_timestamps(size, rng).tolist()]
+
+def iter_cases(n_records, chunk_size=10_000, pbar=None, workers=1):
+    """Yield n_records cases chunk by chunk, spread over worker processes when workers > 1."""
+    sizes = [min(chunk_size, n_records - start) for start in range(0, n_records, chunk_size)]
+    # Independent seed per chunk, so workers never repeat each other
+    tasks = list(zip(sizes, np.random.SeedSequence().spawn(len(sizes))))
+    with Pool(workers) if workers > 1 else nullcontext() as pool:
+        chunks = pool.imap(generate_chunk, tasks) if pool else map(generate_chunk, tasks)
+        for chunk in chunks:
+            yield from chunk
+            if pbar is not None:
+                pbar.update(len(chunk))
+
+def write_records(records, path, output_format):
+    """Stream records to disk one at a time, as a JSON array or as JSON lines."""
+    with open(path, "wb") as f:
+        if output_format == "jsonl":
+            for rec in records:
+                f.write(orjson.dumps(rec) + b"\n")
+            return
+        f.write(b"[\n")
+        for i, rec in enumerate(records):
+            if i:
+                f.write(b",\n")
+            f.write(orjson.dumps(rec))
+        f.write(b"\n]\n")
+
+def main(n_records, output_dir, output_format, workers=1):
     os.makedirs(output_dir, exist_ok=True)
-    cases = [generate_case() for _ in tqdm(range(n_records), desc="Generating investigation cases")]
-    path = os.path.join(output_dir, "investigation_cases.json")
-    json.dump(cases, open(path, "w"), indent=2)
+    path = os.path.join(output_dir, f"investigation_cases.{output_format}")
+    with tqdm(total=n_records, mininterval=0.5, desc="Generating investigation cases") as pbar:
+        write_records(iter_cases(n_records, pbar=pbar, workers=workers), path, output_format)
     print(f"✅ Generated {n_records} cases at {path}")
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--n", type=int, default=100)
     parser.add_argument("--output_dir", default="outputs/cases")
+    parser.add_argument("--format", choices=["json", "jsonl"], default="json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
     args = parser.parse_args()
-    main(args.n, args.output_dir)
+    main(args.n, args.output_dir, args.format, args.workers)
@@ -1,11 +1,18 @@
 # device_user_linked_generator.py
 
-import os, json, random, string
+import os, random, string
+import numpy as np
+import orjson
 from faker import Faker
 from tqdm import tqdm
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import argparse
+from contextlib import nullcontext
 from datetime import datetime
+from functools import partial
+from multiprocessing import Pool
 
 fake = Faker()
 
@@ -19,6 +26,10 @@ BROWSERS = [
 NETWORKS = ["Safaricom", "Airtel", "Telkom", "Zuku", "JTL", "Vodacom"]
 TIMEZONES = ["Africa/Nairobi", "Europe/London", "Asia/Dubai", "America/New_York"]
 RISK_FLAGS = ["vpn_detected", "emulator_detected", "geo_mismatch", "multiple_accounts", "none"]
+RISK_FLAGS_NONNULL = [f for f in RISK_FLAGS if f != "none"]
+# Chance of a device carrying 0, 1 or 2 distinct risk flags (the mix the
+# old draw-then-discard-"none" sampling produced)
+RISK_FLAG_COUNT_WEIGHTS = [0.52, 0.32, 0.16]
 
 def generate_device_id():
     return "dev_" + ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
@@ -35,9 +46,8 @@ def generate_fingerprint(device_id, user_ids):
     country = fake.country()
     city = fake.city()
     
-    risk_sample = random.choices(RISK_FLAGS, k=random.randint(0, 2))
-    if "none" in risk_sample:
-        risk_sample = []
+    n_flags = random.choices(range(len(RISK_FLAG_COUNT_WEIGHTS)), weights=RISK_FLAG_COUNT_WEIGHTS)[0]
+    risk_sample = random.sample(RISK_FLAGS_NONNULL, k=n_flags)
 
     return {
         "device_id": device_id,
@@ -57,10 +67,31 @@ def generate_fingerprint(device_id, user_ids):
     }
 
 def validate_record(record):
+    """Check required fields. Generated records always pass; this is for files from elsewhere."""
     required = ["device_id", "linked_users", "device_type", "ip_address", "browser"]
     return all(k in record and record[k] for k in required)
 
-def main(n_users, avg_devices, output_dir, output_format):
+def generate_user_devices(user_ids, avg_devices, validate=False):
+    """Generate the personal (unshared) devices for a batch of users."""
+    records = []
+    for user_id in user_ids:
+        num_devices = random.randint(1, avg_devices * 2)
+        for _ in range(num_devices):
+            device_id = generate_device_id()
+            record = generate_fingerprint(device_id, [user_id])
+            if not validate or validate_record(record):
+                records.append(record)
+    return records
+
+def generate_chunk(task, avg_devices, validate=False):
+    """Generate devices for one (user_ids, seed) chunk, reseeding random and Faker from the chunk's seed."""
+    user_ids, seed = task
+    chunk_seed = int(np.random.default_rng(seed).integers(2**63))
+    random.seed(chunk_seed)
+    fake.seed_instance(chunk_seed)
+    return generate_user_devices(user_ids, avg_devices, validate)
+
+def main(n_users, avg_devices, output_dir, output_format, workers=1, chunk_size=1000, validate=False):
     os.makedirs(output_dir, exist_ok=True)
     
     users = [generate_user_id() for _ in range(n_users)]
@@ -70,33 +101,36 @@ def main(n_users, avg_devices, output_dir, output_format):
     total_devices = int(n_users * avg_devices)
     shared_count = int(total_devices * 0.1)
     
-    for user_id in tqdm(users, desc="Generating devices per user"):
-        num_devices = random.randint(1, avg_devices * 2)
-        for _ in range(num_devices):
-            device_id = generate_device_id()
-            record = generate_fingerprint(device_id, [user_id])
-            if validate_record(record):
-                device_records.append(record)
+    user_chunks = [users[i:i + chunk_size] for i in range(0, n_users, chunk_size)]
+    # Independent seed per chunk, so workers never repeat each other
+    tasks = list(zip(user_chunks, np.random.SeedSequence().spawn(len(user_chunks))))
+    generate = partial(generate_chunk, avg_devices=avg_devices, validate=validate)
+    with Pool(workers) if workers > 1 else nullcontext() as pool:
+        chunks = pool.imap(generate, tasks) if pool else map(generate, tasks)
+        with tqdm(total=n_users, desc="Generating devices per user", mininterval=0.5) as pbar:
+            for user_chunk, records in zip(user_chunks, chunks):
+                device_records.extend(records)
+                pbar.update(len(user_chunk))
 
     # Inject shared (fraudulent) devices
-    for _ in tqdm(range(shared_count), desc="Injecting shared devices"):
+    for _ in tqdm(range(shared_count), desc="Injecting shared devices", mininterval=0.5, miniters=1000):
         shared_device_id = generate_device_id()
         shared_users = random.sample(users, k=random.randint(2, 4))
         record = generate_fingerprint(shared_device_id, shared_users)
-        if validate_record(record):
+        if not validate or validate_record(record):
             device_records.append(record)
 
     file_path = os.path.join(output_dir, f"linked_devices.{output_format}")
     if output_format == "json":
-        with open(file_path, "w") as f:
-            json.dump(device_records, f, indent=2)
+        with open(file_path, "wb") as f:
+            f.write(orjson.dumps(device_records, option=orjson.OPT_INDENT_2))
     elif output_format == "csv":
-        df = pd.DataFrame(device_records)
-        df["geo_country"] = df["geo_location"].apply(lambda x: x["country"])
-        df["geo_city"] = df["geo_location"].apply(lambda x: x["city"])
-        df.drop(columns=["geo_location"], inplace=True)
-        df["linked_users"] = df["linked_users"].apply(lambda x: ",".join(x))
-        df.to_csv(file_path, index=False)
+        df = pd.json_normalize(device_records).rename(
+            columns={"geo_location.country": "geo_country", "geo_location.city": "geo_city"}
+        )
+        for col in ["linked_users", "browser_plugins", "risk_flags"]:
+            df[col] = df[col].str.join(",")
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), file_path)
 
     print(f"✅ Generated {len(device_records)} device fingerprints linked to {n_users} users.")
     print(f"📁 Saved to {file_path}")
@@ -107,5 +141,7 @@ if __name__ == "__main__":
     parser.add_argument("--avg_devices", type=int, default=2)
     parser.add_argument("--output_dir", default="outputs/linked_devices")
     parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--validate", action="store_true", help="Re-check every generated record")
     args = parser.parse_args()
-    main(args.n_users, args.avg_devices, args.output_dir, args.format)
+    main(args.n_users, args.avg_devices, args.output_dir, args.format, args.workers, validate=args.validate)
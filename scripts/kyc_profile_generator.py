@@ -1,11 +1,17 @@
 # kyc_profile_generator.py
 
-import os, json, random
+import os, random
+import orjson
 from faker import Faker
 from tqdm import tqdm
 import pandas as pd
 import argparse
 
+try:
+    import ijson  # streams large device files record by record
+except ImportError:
+    ijson = None
+
 fake = Faker()
 
 RISK_LEVELS = ["Low", "Medium", "High"]
@@ -26,12 +32,12 @@ def calculate_risk_score(age, transactions_per_month, device_count):
 
 def load_device_user_ids(device_file):
     """Read existing device-user mapping to get user_ids and device counts."""
-    with open(device_file, "r") as f:
-        data = json.load(f)
     user_device_map = {}
-    for d in data:
-        for uid in d["linked_users"]:
-            user_device_map.setdefault(uid, []).append(d["device_id"])
+    with open(device_file, "rb") as f:
+        devices = ijson.items(f, "item") if ijson else orjson.loads(f.read())
+        for d in devices:
+            for uid in d["linked_users"]:
+                user_device_map.setdefault(uid, []).append(d["device_id"])
     return user_device_map
 
 def generate_kyc_profile(user_id, devices):
@@ -68,17 +74,17 @@ def main(device_file, output_dir, output_format):
     user_device_map = load_device_user_ids(device_file)
     kyc_data = []
 
-    for user_id, devices in tqdm(user_device_map.items(), desc="Generating KYC profiles"):
+    for user_id, devices in tqdm(user_device_map.items(), desc="Generating KYC profiles", mininterval=0.5, miniters=1000):
         kyc_data.append(generate_kyc_profile(user_id, devices))
 
     output_file = os.path.join(output_dir, f"kyc_profiles.{output_format}")
 
     if output_format == "json":
-        with open(output_file, "w") as f:
-            json.dump(kyc_data, f, indent=2)
+        with open(output_file, "wb") as f:
+            f.write(orjson.dumps(kyc_data, option=orjson.OPT_INDENT_2))
     elif output_format == "csv":
         df = pd.DataFrame(kyc_data)
-        df["linked_devices"] = df["linked_devices"].apply(lambda x: ",".join(x))
+        df["linked_devices"] = df["linked_devices"].str.join(",")
         df.to_csv(output_file, index=False)
 
     print(f"✅ Generated {len(kyc_data)} KYC profiles linked to device fingerprints.")
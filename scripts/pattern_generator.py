@@ -1,6 +1,5 @@
 # pattern_generator.py
 import os, json, random
-from tqdm import tqdm
 import argparse
 
 PATTERNS = [
@@ -32,7 +31,7 @@ PATTERNS = [
 
 def main(n_records, output_dir):
     os.makedirs(output_dir, exist_ok=True)
-    data = [random.choice(PATTERNS) for _ in tqdm(range(n_records), desc="Generating fraud patterns")]
+    data = random.choices(PATTERNS, k=n_records)
     path = os.path.join(output_dir, "fraud_patterns.json")
     json.dump(data, open(path, "w"), indent=2)
     print(f"✅ Generated {n_records} fraud patterns at {path}")
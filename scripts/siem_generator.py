@@ -1,31 +1,34 @@
 # siem_generator.py
-import random, os, pandas as pd
-from tqdm import tqdm
+import os, numpy as np, pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import argparse
 
-def generate_log_entry():
-    """Create a synthetic SIEM event."""
-    events = ["LOGIN_SUCCESS", "LOGIN_FAIL", "TXN_ATTEMPT", "TXN_SUCCESS", "SUSPICIOUS_ACTIVITY", "ACCOUNT_LOCKED"]
-    severity = {"LOGIN_SUCCESS": "Low", "LOGIN_FAIL": "Medium", "TXN_ATTEMPT": "Low",
-                "TXN_SUCCESS": "Low", "SUSPICIOUS_ACTIVITY": "High", "ACCOUNT_LOCKED": "Critical"}
+EVENTS = ["LOGIN_SUCCESS", "LOGIN_FAIL", "TXN_ATTEMPT", "TXN_SUCCESS", "SUSPICIOUS_ACTIVITY", "ACCOUNT_LOCKED"]
+SEVERITY = {"LOGIN_SUCCESS": "Low", "LOGIN_FAIL": "Medium", "TXN_ATTEMPT": "Low",
+            "TXN_SUCCESS": "Low", "SUSPICIOUS_ACTIVITY": "High", "ACCOUNT_LOCKED": "Critical"}
+DEVICES = ["Android", "iPhone", "Windows", "Mac"]
 
-    event = random.choice(events)
-    return {
-        "timestamp": pd.Timestamp.now() - pd.Timedelta(minutes=random.randint(0, 10000)),
-        "user_id": f"user_{random.randint(1000,9999)}",
-        "event_type": event,
-        "ip_address": f"192.168.{random.randint(0,255)}.{random.randint(0,255)}",
-        "device": random.choice(["Android", "iPhone", "Windows", "Mac"]),
-        "severity": severity[event],
-        "correlation_id": random.randint(100000,999999)
-    }
+def generate_log_frame(n, rng=None):
+    """Create n synthetic SIEM events, built column by column from bulk NumPy draws."""
+    rng = rng or np.random.default_rng()
+    events = rng.choice(EVENTS, n)
+    octets = rng.integers(0, 256, (2, n)).astype(str)
+    return pd.DataFrame({
+        "timestamp": pd.Timestamp.now() - pd.to_timedelta(rng.integers(0, 10001, n), unit="m"),
+        "user_id": np.char.add("user_", rng.integers(1000, 10000, n).astype(str)),
+        "event_type": events,
+        "ip_address": np.char.add(np.char.add("192.168.", octets[0]), np.char.add(".", octets[1])),
+        "device": rng.choice(DEVICES, n),
+        "severity": pd.Series(events).map(SEVERITY),
+        "correlation_id": rng.integers(100000, 1000000, n)
+    })
 
 def main(n_records, output_dir):
     os.makedirs(output_dir, exist_ok=True)
-    data = [generate_log_entry() for _ in tqdm(range(n_records), desc="Generating SIEM logs")]
-    df = pd.DataFrame(data)
+    df = generate_log_frame(n_records)
     path = os.path.join(output_dir, "siem_logs.csv")
-    df.to_csv(path, index=False)
+    pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path)
     print(f"✅ {n_records} SIEM logs saved to {path}")
 
 if __name__ == "__main__":
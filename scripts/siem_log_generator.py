@@ -1,13 +1,16 @@
 # siem_log_generator.py
 
-import os, json, random
-from faker import Faker
+import os, sys
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
 from tqdm import tqdm
-import pandas as pd
 import argparse
-from datetime import datetime, timedelta
-
-fake = Faker()
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from multiprocessing import Pool
 
 EVENT_TYPES = [
     "login_success",
@@ -18,58 +21,165 @@ EVENT_TYPES = [
     "anomaly_detected",
     "account_locked"
 ]
+# Relative frequency of each event type above (routine logins dominate a real SIEM feed)
+EVENT_TYPE_WEIGHTS = np.array([0.50, 0.10, 0.15, 0.05, 0.02, 0.10, 0.08])
 
 def load_devices(device_file):
-    with open(device_file, "r") as f:
-        return json.load(f)
-
-def generate_log(device, user_id):
-    event_type = random.choice(EVENT_TYPES)
-    timestamp = datetime.utcnow() - timedelta(minutes=random.randint(0, 10000))
-    details = {}
-
-    if event_type == "login_failure":
-        details = {"reason": random.choice(["wrong_password", "unknown_device", "geo_mismatch"])}
-    elif event_type == "transaction_initiated":
-        details = {"amount": round(random.uniform(10, 5000), 2), "currency": "KES"}
-    elif event_type == "transaction_blocked":
-        details = {"amount": round(random.uniform(10, 3000), 2), "reason": "high_risk_pattern"}
-    elif event_type == "anomaly_detected":
-        details = {"metric": random.choice(["device_reuse", "ip_velocity", "geo_mismatch"]), "confidence": random.randint(60, 99)}
+    with open(device_file, "rb") as f:
+        return orjson.loads(f.read())
+
+# Large write buffer so the OS sees a few big writes instead of many small ones
+WRITE_BUFFER_BYTES = 1 << 20
+
+# Repetitive columns worth dictionary-encoding in Parquet output
+PARQUET_DICTIONARY_COLUMNS = ["event_type", "geo_country", "geo_city", "device_id"]
+
+LOGIN_FAILURE_REASONS = ["wrong_password", "unknown_device", "geo_mismatch"]
+ANOMALY_METRICS = ["device_reuse", "ip_velocity", "geo_mismatch"]
+
+def build_details(event_types, rng):
+    """Details for every event, filled one event type at a time from draws sized to that type."""
+    details = [{} for _ in range(len(event_types))]
+
+    idx = np.flatnonzero(event_types == "login_failure").tolist()
+    for i, reason in zip(idx, rng.choice(LOGIN_FAILURE_REASONS, len(idx)).tolist()):
+        details[i] = {"reason": reason}
 
+    idx = np.flatnonzero(event_types == "transaction_initiated").tolist()
+    for i, amount in zip(idx, rng.uniform(10, 5000, len(idx)).round(2).tolist()):
+        details[i] = {"amount": amount, "currency": "KES"}
+
+    idx = np.flatnonzero(event_types == "transaction_blocked").tolist()
+    for i, amount in zip(idx, rng.uniform(10, 3000, len(idx)).round(2).tolist()):
+        details[i] = {"amount": amount, "reason": "high_risk_pattern"}
+
+    idx = np.flatnonzero(event_types == "anomaly_detected").tolist()
+    metrics = rng.choice(ANOMALY_METRICS, len(idx)).tolist()
+    confidences = rng.integers(60, 100, len(idx)).tolist()
+    for i, metric, confidence in zip(idx, metrics, confidences):
+        details[i] = {"metric": metric, "confidence": confidence}
+
+    return details
+
+def device_columns(devices):
+    """Flatten the device list into arrays, so per-event device fields become array gathers."""
+    user_counts = np.array([len(d["linked_users"]) for d in devices], dtype=np.int64)
     return {
-        "event_id": f"evt_{random.randint(100000, 999999)}",
-        "timestamp": timestamp.isoformat() + "Z",
-        "device_id": device["device_id"],
-        "user_id": user_id,
-        "ip_address": device["ip_address"],
-        "geo_country": device["geo_location"]["country"],
-        "geo_city": device["geo_location"]["city"],
-        "event_type": event_type,
-        "details": details
+        "device_id": np.array([d["device_id"] for d in devices], dtype=object),
+        "ip_address": np.array([d["ip_address"] for d in devices], dtype=object),
+        "geo_country": np.array([d["geo_location"]["country"] for d in devices], dtype=object),
+        "geo_city": np.array([d["geo_location"]["city"] for d in devices], dtype=object),
+        # One entry per (device, linked user) edge
+        "edge_device": np.repeat(np.arange(len(devices)), user_counts),
+        "edge_user": np.array([uid for d in devices for uid in d["linked_users"]], dtype=object),
     }
 
-def main(device_file, output_dir, n_events, output_format):
-    os.makedirs(output_dir, exist_ok=True)
-    devices = load_devices(device_file)
-    logs = []
+def generate_logs(device_table, n_events, rng=None, first_id=0):
+    """Generate n_events SIEM logs as columns (one list per field), drawing each field in bulk.
 
-    for _ in tqdm(range(n_events), desc="Generating SIEM events"):
-        device = random.choice(devices)
-        user_id = random.choice(device["linked_users"])
-        logs.append(generate_log(device, user_id))
+    Event ids are sequential from first_id, so they stay unique across chunks.
+    """
+    rng = rng or np.random.default_rng()
 
-    output_file = os.path.join(output_dir, f"siem_logs.{output_format}")
+    edge_idx = rng.integers(0, len(device_table["edge_user"]), n_events)
+    dev_idx = device_table["edge_device"][edge_idx]
+    now = np.datetime64(datetime.now(timezone.utc).replace(tzinfo=None), "us")
+    minutes = rng.integers(0, 10001, n_events).astype("timedelta64[m]")
+    timestamps = np.datetime_as_string(now - minutes, unit="us")
+    event_ids = np.arange(first_id, first_id + n_events, dtype=np.int64)
+    event_types = rng.choice(EVENT_TYPES, n_events, p=EVENT_TYPE_WEIGHTS)
 
+    return {
+        "event_id": np.char.add("evt_", np.char.zfill(event_ids.astype(str), 6)).tolist(),
+        "timestamp": np.char.add(timestamps, "Z").tolist(),
+        "device_id": device_table["device_id"][dev_idx].tolist(),
+        "user_id": device_table["edge_user"][edge_idx].tolist(),
+        "ip_address": device_table["ip_address"][dev_idx].tolist(),
+        "geo_country": device_table["geo_country"][dev_idx].tolist(),
+        "geo_city": device_table["geo_city"][dev_idx].tolist(),
+        "event_type": event_types.tolist(),
+        "details": build_details(event_types, rng),
+    }
+
+_worker_device_table = None
+
+def init_worker(device_table):
+    """Hand each worker process the device table once, instead of with every chunk."""
+    global _worker_device_table
+    _worker_device_table = device_table
+
+def generate_chunk(task):
+    """Generate one (first_id, size, seed) chunk of logs inside a worker process."""
+    first_id, size, seed = task
+    return generate_logs(_worker_device_table, size, np.random.default_rng(seed), first_id)
+
+def write_logs(chunks, output_file, output_format, pbar=None):
+    """Write column chunks to disk as they arrive, so the full log set is never held in memory."""
     if output_format == "json":
-        with open(output_file, "w") as f:
-            json.dump(logs, f, indent=2)
+        with open(output_file, "wb", buffering=WRITE_BUFFER_BYTES) as f:
+            f.write(b"[\n")
+            for n, columns in enumerate(chunks):
+                if n:
+                    f.write(b",\n")
+                keys = list(columns)
+                f.write(b",\n".join(
+                    orjson.dumps(dict(zip(keys, row))) for row in zip(*columns.values())
+                ))
+                if pbar is not None:
+                    pbar.update(len(columns["event_id"]))
+            f.write(b"\n]\n")
     elif output_format == "csv":
-        df = pd.DataFrame(logs)
-        df["details"] = df["details"].apply(json.dumps)
-        df.to_csv(output_file, index=False)
+        with open(output_file, "wb", buffering=WRITE_BUFFER_BYTES) as f:
+            writer = None
+            for columns in chunks:
+                columns["details"] = [orjson.dumps(d).decode() for d in columns["details"]]
+                table = pa.Table.from_pydict(columns)
+                if writer is None:
+                    writer = pacsv.CSVWriter(f, table.schema)
+                writer.write_table(table)
+                if pbar is not None:
+                    pbar.update(table.num_rows)
+            if writer is not None:
+                writer.close()
+    elif output_format == "parquet":
+        writer = None
+        for columns in chunks:
+            columns["details"] = [orjson.dumps(d).decode() for d in columns["details"]]
+            table = pa.Table.from_pydict(columns)
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    output_file, table.schema,
+                    compression="zstd", use_dictionary=PARQUET_DICTIONARY_COLUMNS
+                )
+            writer.write_table(table)
+            if pbar is not None:
+                pbar.update(table.num_rows)
+        if writer is not None:
+            writer.close()
+
+def main(device_file, output_dir, n_events, output_format, workers=1, chunk_size=50_000):
+    os.makedirs(output_dir, exist_ok=True)
+    device_table = device_columns(load_devices(device_file))
+
+    # Independent RNG streams per chunk, so workers never repeat each other
+    starts = range(0, n_events, chunk_size)
+    sizes = [min(chunk_size, n_events - start) for start in starts]
+    tasks = list(zip(starts, sizes, np.random.SeedSequence().spawn(len(sizes))))
+
+    output_file = os.path.join(output_dir, f"siem_logs.{output_format}")
+    with Pool(workers, initializer=init_worker, initargs=(device_table,)) if workers > 1 else nullcontext() as pool:
+        if pool:
+            chunks = pool.imap(generate_chunk, tasks)
+        else:
+            chunks = (
+                generate_logs(device_table, size, np.random.default_rng(seed), first_id)
+                for first_id, size, seed in tasks
+            )
+        with tqdm(total=n_events, desc="Generating SIEM events", mininterval=0.5,
+                  disable=not sys.stderr.isatty()) as pbar:
+            write_logs(chunks, output_file, output_format, pbar)
 
-    print(f"✅ Generated {len(logs)} SIEM logs linked to devices and users.")
+    print(f"✅ Generated {n_events} SIEM logs linked to devices and users.")
     print(f"📁 Saved to {output_file}")
 
 if __name__ == "__main__":
@@ -77,6 +187,7 @@ if __name__ == "__main__":
     parser.add_argument("--device_file", default="outputs/linked_devices/linked_devices.json")
     parser.add_argument("--output_dir", default="outputs/siem_logs")
     parser.add_argument("--n_events", type=int, default=1000)
-    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("--format", choices=["json", "csv", "parquet"], default="json")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
     args = parser.parse_args()
-    main(args.device_file, args.output_dir, args.n_events, args.format)
+    main(args.device_file, args.output_dir, args.n_events, args.format, args.workers)
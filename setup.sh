@@ -34,7 +34,8 @@ echo "This may take a few minutes..."
 
 pip install -q google-generativeai python-dotenv \
     pandas numpy sentence-transformers chromadb \
-    streamlit plotly scikit-learn tqdm pyarrow
+    streamlit plotly scikit-learn tqdm pyarrow \
+    orjson cachetools "optimum[onnxruntime]" faiss-cpu
 
 echo "✓ Dependencies installed"
 